@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+AI Scheduling for Wild Defender Game
+====================================
+
+Keeps enemy decisions inside a per-frame time budget. Every enemy is queued
+for a fresh decision (state re-evaluation, steering, shooting) each frame, and
+the queue is worked off round-robin in batches until the budget is used up;
+whoever is left keeps acting on its previous decision and goes first next
+frame. Movement and collision still run for every enemy every frame.
+
+At least one batch is decided per frame, so a wave bigger than the budget
+slows decisions down instead of freezing them.
+"""
+
+import time
+from typing import List, Optional, Tuple
+from utils import Vector2
+from ecs import Archetype, World
+from systems import AI_DECIDED_AT, decide_enemy_rows, apply_physics, live_rows
+from bossplanner import BossPlanner
+
+class AIScheduler:
+    """Round-robin enemy decisions under a per-frame time budget"""
+    
+    def __init__(self, budget_ms: Optional[float] = 2.0, batch_size: int = 64):
+        self.budget = budget_ms / 1000.0 if budget_ms is not None else None  # None = no limit
+        self.batch_size = batch_size
+        self.cursor = 0  # queue position of the next enemy, counted over all AI archetypes
+        
+        # Metrics of the last frame
+        self.queue_depth = 0  # enemies left waiting for a fresh decision
+        self.decisions = 0    # enemies decided
+        self.latency = 0.0    # game seconds the oldest refreshed decision had been standing
+        self.elapsed = 0.0    # seconds spent deciding
+    
+    def update(self, world: World, dt: float, player_pos: Vector2, projectiles: List, current_time: float,
+               planner: Optional[BossPlanner] = None):
+        """Decide for as many queued enemies as the budget allows, then move every enemy"""
+        start = time.perf_counter()
+        if world.flow is not None:
+            world.flow.update(player_pos.x, player_pos.y)
+        
+        archetypes = world.query('ai')
+        total = sum(archetype.count for archetype in archetypes)
+        position = self.cursor % total if total else 0
+        decided = 0
+        latency = 0.0
+        while decided < total:
+            archetype, row = self._locate(archetypes, position)
+            count = min(self.batch_size, archetype.count - row, total - decided)
+            rows = slice(row, row + count)
+            
+            # Enemies that were never decided (just spawned) have no latency yet
+            decided_at = [when for when in archetype.columns['ai'][rows, AI_DECIDED_AT].tolist() if when > 0]
+            if decided_at:
+                latency = max(latency, current_time - min(decided_at))
+            
+            decide_enemy_rows(archetype, rows, player_pos, projectiles, current_time, world.flow)
+            decided += count
+            position = (position + count) % total
+            if self.budget is not None and time.perf_counter() - start >= self.budget:
+                break
+        
+        self.cursor = position
+        self.queue_depth = total - decided
+        self.decisions = decided
+        self.latency = latency
+        self.elapsed = time.perf_counter() - start
+        
+        # Bosses with a fresh plan follow it instead
+        if planner is not None:
+            planner.apply(current_time, player_pos, projectiles)
+        
+        for archetype in archetypes:
+            apply_physics(archetype, live_rows(archetype), dt, world.tiles)
+    
+    def _locate(self, archetypes: List[Archetype], position: int) -> Tuple[Archetype, int]:
+        """Archetype and row of a queue position"""
+        for archetype in archetypes:
+            if position < archetype.count:
+                return archetype, position
+            position -= archetype.count
+        raise IndexError(position)
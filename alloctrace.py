@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Allocation Tracking for Wild Defender Game
+==========================================
+
+Debug tool that uses tracemalloc snapshots to measure, frame by frame, how many
+objects and bytes each game module allocates and which source lines allocate the
+most. Snapshots only see memory that is still held at the end of a frame, so the
+game also wraps each part of its update in a section: the tracemalloc peak is
+reset on entry, which attributes memory allocated and freed again within the
+frame (transient churn) to the module doing the work. Used to drive
+steady-state gameplay towards zero allocations per frame.
+"""
+
+import os
+import sys
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Tuple, TextIO
+
+class Section:
+    """Context manager measuring the transient memory peak of one part of a frame"""
+    
+    def __init__(self, tracker: 'AllocationTracker', name: str):
+        self.tracker = tracker
+        self.name = name
+        self.start_memory = 0
+    
+    def __enter__(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.tracker.note_peak(peak)
+        tracemalloc.reset_peak()
+        self.start_memory = current
+    
+    def __exit__(self, *exc_info):
+        _, peak = tracemalloc.get_traced_memory()
+        self.tracker.note_peak(peak)
+        totals = self.tracker.section_totals[self.name]
+        churn = peak - self.start_memory
+        totals[0] += churn
+        totals[1] = max(totals[1], churn)
+        return False
+
+class AllocationTracker:
+    """Per-frame allocation statistics grouped by game module and source line"""
+    
+    # Tools that never run inside the game loop, and the tracker itself
+    EXCLUDED_MODULES = ('alloctrace', 'simulate', 'env', 'task', 'get-pip')
+    
+    def __init__(self, report_interval: int = 60, top_lines: int = 5, stream: TextIO = sys.stderr):
+        self.report_interval = report_interval
+        self.top_lines = top_lines
+        self.stream = stream
+        
+        # Only trace allocations made from the game's own modules: every module next to this one
+        directory = os.path.dirname(os.path.abspath(__file__))
+        self.modules = sorted(name[:-3] for name in os.listdir(directory)
+                              if name.endswith('.py') and name[:-3] not in self.EXCLUDED_MODULES)
+        self.module_files = {os.path.join(directory, module + '.py'): module for module in self.modules}
+        self.filters = [tracemalloc.Filter(True, path) for path in self.module_files]
+        
+        self.frames = 0
+        self.module_totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        self.line_totals: Dict[Tuple[str, int], List[int]] = defaultdict(lambda: [0, 0])
+        self.transient_peak = 0
+        self.sections: Dict[str, Section] = {}
+        self.section_totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])  # summed and largest churn
+        self._frame_start_memory = 0
+        self._frame_peak = 0
+        self._previous = None
+    
+    def start(self):
+        """Start tracing and take the baseline snapshot"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._previous = self._snapshot()
+    
+    def stop(self):
+        """Print a final report and stop tracing"""
+        if self.frames:
+            self.report()
+        tracemalloc.stop()
+    
+    def begin_frame(self):
+        """Mark the start of a frame"""
+        tracemalloc.reset_peak()
+        self._frame_start_memory = tracemalloc.get_traced_memory()[0]
+        self._frame_peak = 0
+    
+    def section(self, name: str) -> Section:
+        """Context manager attributing the transient memory of a part of the frame to name"""
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+    
+    def note_peak(self, peak: int):
+        """Remember a peak before sections reset it, for the frame's overall transient peak"""
+        self._frame_peak = max(self._frame_peak, peak)
+    
+    def end_frame(self):
+        """Compare against the previous frame and accumulate allocation statistics"""
+        _, peak = tracemalloc.get_traced_memory()
+        self.note_peak(peak)
+        self.transient_peak = max(self.transient_peak, self._frame_peak - self._frame_start_memory)
+        
+        snapshot = self._snapshot()
+        for stat in snapshot.compare_to(self._previous, 'lineno'):
+            if stat.count_diff <= 0 and stat.size_diff <= 0:
+                continue
+            
+            frame = stat.traceback[0]
+            module = self.module_files.get(frame.filename, os.path.basename(frame.filename))
+            totals = self.module_totals[module]
+            totals[0] += max(stat.count_diff, 0)
+            totals[1] += max(stat.size_diff, 0)
+            
+            line = self.line_totals[(module, frame.lineno)]
+            line[0] += max(stat.count_diff, 0)
+            line[1] += max(stat.size_diff, 0)
+        
+        self._previous = snapshot
+        self.frames += 1
+        if self.frames % self.report_interval == 0:
+            self.report()
+    
+    def report(self):
+        """Print per-frame averages since the last report and reset them"""
+        frames = self.frames % self.report_interval or self.report_interval
+        write = self.stream.write
+        
+        write(f"--- allocations per frame (average of {frames} frames, frame {self.frames}) ---\n")
+        for module in self.modules:
+            blocks, size = self.module_totals.get(module, (0, 0))
+            write(f"  {module:<12} {blocks / frames:8.1f} objects {size / frames:10.1f} bytes\n")
+        write(f"  transient peak: {self.transient_peak} bytes\n")
+        for name, (churn, largest) in self.section_totals.items():
+            write(f"  {name:<12} {churn / frames:10.1f} bytes transient (largest {largest})\n")
+        
+        top = sorted(self.line_totals.items(), key=lambda item: item[1][1], reverse=True)
+        for (module, lineno), (blocks, size) in top[:self.top_lines]:
+            write(f"  {module}.py:{lineno:<5} {blocks / frames:8.1f} objects {size / frames:10.1f} bytes\n")
+        
+        self.module_totals.clear()
+        self.line_totals.clear()
+        self.section_totals.clear()
+        self.transient_peak = 0
+    
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        """Take a snapshot restricted to the game's modules"""
+        return tracemalloc.take_snapshot().filter_traces(self.filters)
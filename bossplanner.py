@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Boss Planning for Wild Defender Game
+====================================
+
+Plans boss moves in a worker process so that searching never costs frame time.
+The game sends a compact snapshot of a boss, the player and the player's shots
+near the boss; the worker tries every move (left, stay, right, with or without
+a jump) over the next second against the predicted shot paths and sends back
+the move that dodges best while holding the distance of the boss's current
+attack phase, together with that phase's volley.
+
+Plans arrive asynchronously and expire after a short time. A boss without a
+fresh plan simply keeps following the patrol/chase/attack state machine.
+
+Attack phases by remaining health:
+    above 50%   keeps its distance, single aimed shots
+    above 25%   closes in, three-shot spread
+    below       presses the player, five-shot spread
+"""
+
+import math
+import multiprocessing
+import signal
+import struct
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from constants import EntityType
+
+# seq, game time, boss x/y/width/height/speed/jump speed/gravity/health fraction, on ground,
+# player x/velocity x, number of shots
+REQUEST = struct.Struct('<Id8d?2dH')
+SHOT = struct.Struct('<5f')  # x, y, velocity x, velocity y, radius
+# seq, expiry time, direction, jump, number of volley angles
+PLAN = struct.Struct('<IdbbB')
+ANGLE = struct.Struct('<f')
+
+HORIZON = 1.0       # seconds of the future a plan is searched over
+STEP = 1.0 / 30.0   # simulation step of the search
+PLAN_LIFETIME = 0.6  # game seconds a plan is followed for
+SHOT_RADIUS = 600.0  # only player shots this close to the boss are sent
+
+# Per phase: preferred distance to the player and volley angle offsets (radians)
+PHASES = (
+    (300.0, (0.0,)),
+    (200.0, (-0.15, 0.0, 0.15)),
+    (120.0, (-0.3, -0.15, 0.0, 0.15, 0.3)),
+)
+
+@dataclass
+class BossPlan:
+    """Move and volley for a boss, valid until expires (game time)"""
+    direction: int
+    jump: bool
+    shots: Tuple[float, ...]
+    expires: float
+
+def attack_phase(health_fraction: float) -> int:
+    """Attack phase (0, 1 or 2) for the boss's remaining health"""
+    return 0 if health_fraction > 0.5 else 1 if health_fraction > 0.25 else 2
+
+def plan_move(request: bytes) -> bytes:
+    """Search the best move for a boss snapshot and encode the plan; runs in the worker"""
+    (seq, game_time, x, y, width, height, speed, jump_speed, gravity, health,
+     on_ground, player_x, player_vx, count) = REQUEST.unpack_from(request)
+    shots = list(SHOT.iter_unpack(request[REQUEST.size:REQUEST.size + count * SHOT.size]))
+    preferred, volley = PHASES[attack_phase(health)]
+    steps = int(HORIZON / STEP)
+    
+    best, best_cost = (0, False), math.inf
+    for direction in (0, -1, 1):
+        for jump in ((False, True) if on_ground else (False,)):
+            boss_x, boss_y, velocity_y = x, y, jump_speed if jump else 0.0
+            cost = 0.5 if jump else 0.0
+            remaining = list(shots)
+            for step in range(1, steps + 1):
+                t = step * STEP
+                boss_x += direction * speed * STEP
+                if jump:
+                    velocity_y += gravity * STEP
+                    boss_y = min(boss_y + velocity_y * STEP, y)
+                
+                # Shots fly straight; earlier hits cost more
+                left, right, top = boss_x - width / 2, boss_x + width / 2, boss_y - height
+                for shot in remaining:
+                    shot_x, shot_y, shot_vx, shot_vy, radius = shot
+                    shot_x += shot_vx * t
+                    shot_y += shot_vy * t
+                    if left - radius < shot_x < right + radius and top - radius < shot_y < boss_y + radius:
+                        cost += 100.0 * (steps - step + 1) / steps
+                        remaining.remove(shot)
+                        break
+            
+            # Hold the phase's distance to where the player will be
+            distance = abs(boss_x - (player_x + player_vx * HORIZON))
+            cost += abs(distance - preferred) / 100.0
+            if cost < best_cost:
+                best, best_cost = (direction, jump), cost
+    
+    direction, jump = best
+    return PLAN.pack(seq, game_time + PLAN_LIFETIME, direction, jump, len(volley)) + b''.join(
+        ANGLE.pack(angle) for angle in volley)
+
+def _serve(connection):
+    """Worker process: answer planning requests until the game closes the pipe"""
+    # The game handles Ctrl+C; SIGTERM must still stop the worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    while True:
+        try:
+            request = connection.recv_bytes()
+        except EOFError:
+            break
+        if not request:
+            break
+        connection.send_bytes(plan_move(request))
+
+class BossPlanner:
+    """Asynchronous planning service for bosses; the game loop never waits on it"""
+    
+    def __init__(self, replan_interval: float = 0.25):
+        self.replan_interval = replan_interval
+        self.connection, worker_end = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(worker_end,), name='boss-planner', daemon=True)
+        self.process.start()
+        worker_end.close()
+        
+        self.seq = 0
+        self.in_flight = None  # (seq, boss, wall clock send time) of the request being planned
+        self.plans: Dict[int, Tuple[object, BossPlan]] = {}  # boss entity -> (boss, latest plan)
+        self.requested: Dict[int, float] = {}  # boss entity -> game time of its last request
+        
+        # Metrics
+        self.plans_received = 0
+        self.latency = 0.0  # wall seconds from request to plan, last plan
+    
+    def update(self, game_time: float, enemies: List, player, projectiles: List):
+        """Collect finished plans and send the next boss snapshot; never blocks"""
+        while self.connection.poll():
+            self._receive(self.connection.recv_bytes())
+        if self.in_flight is not None:
+            return
+        
+        # One request at a time, for the boss that has waited longest
+        due = [enemy for enemy in enemies
+               if enemy.enemy_type == 'boss' and enemy.active
+               and game_time - self.requested.get(enemy.entity, -math.inf) >= self.replan_interval]
+        if due:
+            boss = min(due, key=lambda enemy: self.requested.get(enemy.entity, -math.inf))
+            self.requested[boss.entity] = game_time
+            self.seq += 1
+            self.in_flight = (self.seq, boss, time.perf_counter())
+            self.connection.send_bytes(self._snapshot(self.seq, game_time, boss, player, projectiles))
+    
+    def _snapshot(self, seq: int, game_time: float, boss, player, projectiles: List) -> bytes:
+        """Pack a boss, the player and the player's shots near the boss"""
+        position = boss.position
+        shots = [
+            SHOT.pack(shot.position.x, shot.position.y, shot.velocity.x, shot.velocity.y, shot.radius)
+            for shot in projectiles
+            if shot.active and shot.owner_type == EntityType.PLAYER
+            and abs(shot.position.x - position.x) <= SHOT_RADIUS
+        ]
+        return REQUEST.pack(
+            seq, game_time, position.x, position.y, boss.width, boss.height, boss.speed,
+            boss.jump_speed, boss.gravity, boss.health / boss.max_health, boss.on_ground,
+            player.position.x, player.velocity.x, len(shots)) + b''.join(shots)
+    
+    def _receive(self, message: bytes):
+        """Store a plan sent back by the worker"""
+        seq, expires, direction, jump, count = PLAN.unpack_from(message)
+        if self.in_flight is None or self.in_flight[0] != seq:
+            return  # answer to a request from before reset()
+        _, boss, sent = self.in_flight
+        self.in_flight = None
+        shots = tuple(angle for angle, in ANGLE.iter_unpack(message[PLAN.size:PLAN.size + count * ANGLE.size]))
+        self.plans[boss.entity] = (boss, BossPlan(direction, bool(jump), shots, expires))
+        self.plans_received += 1
+        self.latency = time.perf_counter() - sent
+    
+    def apply(self, game_time: float, player_pos, projectiles: List):
+        """Let every boss with an unexpired plan act on it instead of its state machine decision"""
+        for boss, plan in self.plans.values():
+            if boss.active and plan.expires > game_time and boss.entity in boss.world.locations:
+                boss.follow_plan(plan, player_pos, projectiles, game_time)
+    
+    def reset(self):
+        """Forget all plans, e.g. when the level's entities are replaced"""
+        self.plans.clear()
+        self.requested.clear()
+        self.in_flight = None
+    
+    def close(self):
+        """Stop the worker process"""
+        try:
+            self.connection.send_bytes(b'')
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.kill()
+        self.connection.close()
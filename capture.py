@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Frame Capture for Wild Defender Game
+====================================
+
+Reads rendered frames as NumPy arrays for pixel-based agents and visual
+regression tests. Frames are never converted with pygame.image.tostring: the
+screen pixels are accessed through a pygame.surfarray.pixels3d view and copied
+once into a preallocated (height, width, 3) buffer, so capturing a frame
+allocates nothing per frame.
+
+A smaller capture size downscales the frame into a preallocated surface first,
+which also makes the copy proportionally cheaper.
+"""
+
+import pygame
+import numpy as np
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+class FrameCapture:
+    """Captures a surface into a reusable RGB buffer, optionally downscaled"""
+    
+    def __init__(self, surface: pygame.Surface, size: Optional[Tuple[int, int]] = None):
+        self.surface = surface
+        self.size = tuple(size) if size else surface.get_size()
+        
+        # Downscaled frames are rendered into a surface of the same pixel format
+        self.scaled = None
+        if self.size != surface.get_size():
+            self.scaled = pygame.Surface(self.size, 0, surface)
+        
+        width, height = self.size
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+    
+    @contextmanager
+    def pixels(self) -> Iterator[np.ndarray]:
+        """Zero-copy (width, height, 3) view of the frame; the surface is locked while it is referenced"""
+        view = pygame.surfarray.pixels3d(self._source())
+        try:
+            yield view
+        finally:
+            del view
+    
+    def capture(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Copy the current frame into out (default: the capture's own buffer) and return it"""
+        if out is None:
+            out = self.frame
+        with self.pixels() as view:
+            np.copyto(out, view.transpose(1, 0, 2))
+        return out
+    
+    def _source(self) -> pygame.Surface:
+        """Surface holding the frame at capture size"""
+        if self.scaled is None:
+            return self.surface
+        pygame.transform.scale(self.surface, self.size, self.scaled)
+        return self.scaled
@@ -8,17 +8,29 @@ Handles collectible items like health boosts, extra lives, and power-ups.
 
 import pygame
 import math
+from typing import Optional
 from utils import Vector2
 from camera import Camera
 from constants import GREEN, BLUE, YELLOW, WHITE, ORANGE
+from ecs import Entity, World, Field, VectorField
+from systems import animate_collectible_rows
 
-class Collectible:
+class Collectible(Entity):
     """Collectible class for health boosts, extra lives, etc."""
     
-    def __init__(self, x: float, y: float, collectible_type: str):
+    components = ('position', 'collider', 'animation', 'renderable')
+    position = VectorField('position')
+    width = Field('collider', 0, int)
+    height = Field('collider', 1, int)
+    bob_offset = Field('animation', 0)
+    bob_speed = Field('animation', 1)
+    
+    def __init__(self, x: float, y: float, collectible_type: str, world: Optional[World] = None):
+        super().__init__(world)
         self.position = Vector2(x, y)
         self.type = collectible_type  # 'health', 'life', 'power'
-        self.rect = pygame.Rect(x - 15, y - 15, 30, 30)
+        self.width = 30
+        self.height = 30
         self.active = True
         self.bob_offset = 0
         self.bob_speed = 3
@@ -34,13 +46,20 @@ class Collectible:
             self.color = YELLOW
             self.value = 1
     
+    @property
+    def rect(self) -> pygame.Rect:
+        """Bounding rectangle including the floating offset"""
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        # Create floating effect
+        float_y = math.sin(self.bob_offset) * 3
+        rect.center = (int(self.position.x), int(self.position.y + float_y))
+        return rect
+    
     def update(self, dt: float):
         """Update collectible animation"""
         if self.active:
-            self.bob_offset += self.bob_speed * dt
-            # Create floating effect
-            float_y = math.sin(self.bob_offset) * 3
-            self.rect.centery = int(self.position.y + float_y)
+            archetype, row = self.locate()
+            animate_collectible_rows(archetype, slice(row, row + 1), dt)
     
     def draw(self, screen: pygame.Surface, camera: Camera):
         """Draw collectible on screen"""
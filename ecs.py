@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Entity-Component-System Core for Wild Defender Game
+===================================================
+
+Stores entity data in archetypes: every distinct set of components gets its own
+table of dense NumPy columns, so systems can process all entities of the same
+kind in one vectorized pass. Removing an entity swaps the last row into its
+place, which keeps the columns dense and makes removal O(1).
+
+Game classes such as Player and Enemy are thin wrappers around an entity. Their
+familiar attributes (position, health, speed, ...) are descriptors that read and
+write the component columns.
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils import Vector2
+
+# Number of float columns per component (0 = tag without data)
+COMPONENTS = {
+    'position': 2,      # x, y (feet for characters, centre for projectiles)
+    'velocity': 2,      # x, y
+    'health': 2,        # current, maximum
+    'collider': 2,      # width, height
+    'physics': 2,       # gravity, on_ground
+    'ai': 9,            # see AI_* indices in systems.py
+    'projectile': 3,    # damage, owner EntityType value, radius
+    'animation': 2,     # bob offset, bob speed
+    'renderable': 0,    # drawn every frame by its owner
+}
+
+class Archetype:
+    """Dense storage for all entities sharing one set of components"""
+    
+    def __init__(self, signature: Tuple[str, ...], capacity: int = 16):
+        self.signature = signature
+        self.capacity = capacity
+        self.count = 0
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros((capacity, COMPONENTS[name])) for name in signature
+        }
+        self.entities: List[int] = []   # row -> entity id
+        self.owners: List[object] = []  # row -> wrapper object
+    
+    def add(self, entity: int, owner: object) -> int:
+        """Append a zero-initialised row for an entity and return its row"""
+        if self.count == self.capacity:
+            self._grow()
+        
+        row = self.count
+        for column in self.columns.values():
+            column[row] = 0
+        self.entities.append(entity)
+        self.owners.append(owner)
+        self.count += 1
+        return row
+    
+    def remove(self, row: int) -> Optional[int]:
+        """Remove a row by moving the last row into it; return the moved entity"""
+        last = self.count - 1
+        moved = None
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            self.entities[row] = self.entities[last]
+            self.owners[row] = self.owners[last]
+            moved = self.entities[row]
+        self.entities.pop()
+        self.owners.pop()
+        self.count -= 1
+        return moved
+    
+    def view(self, name: str) -> np.ndarray:
+        """Return the live rows of a component column"""
+        return self.columns[name][:self.count]
+    
+    def _grow(self):
+        """Double the capacity of every column"""
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros((self.capacity, column.shape[1]))
+            grown[:self.count] = column[:self.count]
+            self.columns[name] = grown
+
+class World:
+    """Collection of archetypes and the location of every entity"""
+    
+    def __init__(self):
+        self.archetypes: Dict[Tuple[str, ...], Archetype] = {}
+        self.locations: Dict[int, Tuple[Archetype, int]] = {}
+        self._next_entity = 0
+        self._queries: Dict[Tuple, List[Archetype]] = {}  # matching archetypes per query
+        self.tiles = None  # TileMap the level's entities collide with, if any
+        self.flow = None   # FlowField toward the player over those tiles, if any
+    
+    def spawn(self, owner: object, components: Iterable[str]) -> int:
+        """Create an entity with zeroed components and return its id"""
+        signature = tuple(sorted(components))
+        archetype = self.archetypes.get(signature)
+        if archetype is None:
+            archetype = self.archetypes[signature] = Archetype(signature)
+            self._queries.clear()
+        
+        entity = self._next_entity
+        self._next_entity += 1
+        self.locations[entity] = (archetype, archetype.add(entity, owner))
+        return entity
+    
+    def despawn(self, entity: int):
+        """Destroy an entity"""
+        archetype, row = self.locations.pop(entity)
+        moved = archetype.remove(row)
+        if moved is not None:
+            self.locations[moved] = (archetype, row)
+    
+    def query(self, *components: str, exclude: Tuple[str, ...] = ()) -> List[Archetype]:
+        """Return non-empty archetypes that have all components and none of the excluded ones"""
+        key = (components, exclude)
+        matches = self._queries.get(key)
+        if matches is None:
+            matches = self._queries[key] = [
+                archetype for signature, archetype in self.archetypes.items()
+                if all(name in signature for name in components)
+                and not any(name in signature for name in exclude)
+            ]
+        return [archetype for archetype in matches if archetype.count]
+    
+    def __len__(self) -> int:
+        return len(self.locations)
+
+class Field:
+    """Wrapper attribute stored in one column of a component"""
+    
+    def __init__(self, component: str, index: int = 0, cast=float):
+        self.component = component
+        self.index = index
+        self.cast = cast
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        archetype, row = obj.world.locations[obj.entity]
+        return self.cast(archetype.columns[self.component][row, self.index])
+    
+    def __set__(self, obj, value):
+        archetype, row = obj.world.locations[obj.entity]
+        archetype.columns[self.component][row, self.index] = value
+
+class ComponentVector(Vector2):
+    """Vector2 view onto a two-column component of an entity"""
+    
+    def __init__(self, world: "World", entity: int, component: str):
+        self._world = world
+        self._entity = entity
+        self._component = component
+    
+    def _cell(self):
+        """Column and row holding the vector"""
+        archetype, row = self._world.locations[self._entity]
+        return archetype.columns[self._component], row
+    
+    @property
+    def x(self) -> float:
+        column, row = self._cell()
+        return float(column[row, 0])
+    
+    @x.setter
+    def x(self, value: float):
+        column, row = self._cell()
+        column[row, 0] = value
+    
+    @property
+    def y(self) -> float:
+        column, row = self._cell()
+        return float(column[row, 1])
+    
+    @y.setter
+    def y(self, value: float):
+        column, row = self._cell()
+        column[row, 1] = value
+    
+    def __repr__(self) -> str:
+        return f"ComponentVector(x={self.x}, y={self.y})"
+
+class VectorField:
+    """Wrapper attribute exposing a two-column component as a Vector2"""
+    
+    def __init__(self, component: str):
+        self.component = component
+        self.view_name = '_view_' + component
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        view = obj.__dict__.get(self.view_name)
+        if view is None:
+            view = obj.__dict__[self.view_name] = ComponentVector(obj.world, obj.entity, self.component)
+        return view
+    
+    def __set__(self, obj, value: Vector2):
+        archetype, row = obj.world.locations[obj.entity]
+        cell = archetype.columns[self.component][row]
+        cell[0] = value.x
+        cell[1] = value.y
+
+class Entity:
+    """Base class for game objects whose data lives in a World"""
+    
+    # Components every instance of the class is created with
+    components: Tuple[str, ...] = ()
+    
+    def __init__(self, world: Optional[World] = None):
+        # Stand-alone objects get a private world so the class API keeps working
+        self.world = world if world is not None else World()
+        self.entity = self.world.spawn(self, self.components)
+    
+    def destroy(self):
+        """Remove the entity's data from its world"""
+        if self.entity in self.world.locations:
+            self.world.despawn(self.entity)
+    
+    def locate(self) -> Tuple[Archetype, int]:
+        """Return the archetype and row holding this entity"""
+        return self.world.locations[self.entity]
+    
+    def move_to(self, world: World):
+        """Move the entity with all its component data into another world"""
+        archetype, row = self.locate()
+        data = {name: column[row].copy() for name, column in archetype.columns.items()}
+        self.world.despawn(self.entity)
+        
+        self.world = world
+        self.entity = world.spawn(self, self.components)
+        archetype, row = self.locate()
+        for name, values in data.items():
+            archetype.columns[name][row] = values
+        
+        # Keep vector views handed out earlier pointing at the entity
+        for value in self.__dict__.values():
+            if isinstance(value, ComponentVector):
+                value._world = world
+                value._entity = self.entity
@@ -6,19 +6,50 @@ Enemy System for Wild Defender Game
 Handles enemy AI, behavior, and combat mechanics.
 """
 
+import math
 import pygame
-from typing import List
+from typing import Dict, List, Optional, Sequence
 from utils import Vector2
 from camera import Camera
 from constants import (
     RED, PURPLE, DARK_GRAY, WHITE, GREEN, ORANGE,
     EntityType
 )
+from ecs import Entity, World, Field, VectorField
+from bossplanner import BossPlan
+from systems import (
+    AI_STATE, AI_SPEED, AI_DETECTION_RANGE, AI_SHOOT_COOLDOWN, AI_LAST_SHOT_TIME,
+    AI_PATROL_START_X, AI_PATROL_RANGE, AI_DIRECTION, AI_STATE_NAMES,
+    update_enemy_rows
+)
 
-class Enemy:
+class Enemy(Entity):
     """Enemy class with AI, health, movement, and shooting"""
     
-    def __init__(self, x: float, y: float, enemy_type: str):
+    components = ('position', 'velocity', 'health', 'collider', 'physics', 'ai', 'renderable')
+    position = VectorField('position')
+    velocity = VectorField('velocity')
+    health = Field('health', 0, int)
+    max_health = Field('health', 1, int)
+    width = Field('collider', 0, int)
+    height = Field('collider', 1, int)
+    gravity = Field('physics', 0)
+    on_ground = Field('physics', 1, bool)
+    speed = Field('ai', AI_SPEED)
+    detection_range = Field('ai', AI_DETECTION_RANGE)
+    shoot_cooldown = Field('ai', AI_SHOOT_COOLDOWN)
+    last_shot_time = Field('ai', AI_LAST_SHOT_TIME)
+    patrol_start_x = Field('ai', AI_PATROL_START_X)
+    patrol_range = Field('ai', AI_PATROL_RANGE)
+    direction = Field('ai', AI_DIRECTION, int)
+    _ai_state = Field('ai', AI_STATE, int)
+    
+    # Stats that can be overridden per enemy type for balancing
+    TUNABLE_STATS = ('max_health', 'speed', 'damage', 'shoot_cooldown', 'detection_range')
+    
+    def __init__(self, x: float, y: float, enemy_type: str, world: Optional[World] = None,
+                 stats: Optional[Dict[str, float]] = None):
+        super().__init__(world)
         self.position = Vector2(x, y)
         self.velocity = Vector2(0, 0)
         self.enemy_type = enemy_type
@@ -54,9 +85,14 @@ class Enemy:
             self.shoot_cooldown = 1.0
             self.detection_range = 500
         
+        # Apply balancing overrides
+        if stats:
+            for name, value in stats.items():
+                setattr(self, name, value)
+        
         self.health = self.max_health
-        self.rect = pygame.Rect(x - self.width//2, y - self.height, self.width, self.height)
         self.last_shot_time = 0
+        self.last_melee_time = 0
         self.direction = 1  # 1 for right, -1 for left
         self.ai_state = 'patrol'  # 'patrol', 'chase', 'attack'
         self.patrol_start_x = x
@@ -66,94 +102,70 @@ class Enemy:
         self.gravity = 800
         self.jump_speed = -300
     
+    @property
+    def ai_state(self) -> str:
+        return AI_STATE_NAMES[self._ai_state]
+    
+    @ai_state.setter
+    def ai_state(self, state: str):
+        self._ai_state = AI_STATE_NAMES.index(state)
+    
+    @property
+    def rect(self) -> pygame.Rect:
+        """Bounding rectangle with the enemy's feet at its position"""
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        rect.centerx = int(self.position.x)
+        rect.bottom = int(self.position.y)
+        return rect
+    
     def update(self, dt: float, player_pos: Vector2, projectiles: List):
         """Update enemy AI, movement, and behavior"""
         if not self.active:
             return
         
-        # Calculate distance to player
-        distance_to_player = (self.position - player_pos).magnitude()
-        
-        # AI State Machine
-        if distance_to_player <= self.detection_range:
-            if distance_to_player <= 100:
-                self.ai_state = 'attack'
-            else:
-                self.ai_state = 'chase'
-        else:
-            self.ai_state = 'patrol'
-        
-        # Execute AI behavior
-        if self.ai_state == 'patrol':
-            self._patrol(dt)
-        elif self.ai_state == 'chase':
-            self._chase_player(player_pos, dt)
-        elif self.ai_state == 'attack':
-            self._attack_player(player_pos, dt, projectiles)
-        
-        # Apply physics
-        self._apply_physics(dt)
-        
-        # Update rectangle position
-        self.rect.centerx = int(self.position.x)
-        self.rect.bottom = int(self.position.y)
+        # Same state machine the game runs for all enemies at once (systems.update_enemies)
+        if self.world.flow is not None:
+            self.world.flow.update(player_pos.x, player_pos.y)
+        archetype, row = self.locate()
+        update_enemy_rows(archetype, slice(row, row + 1), dt, player_pos, projectiles,
+                          pygame.time.get_ticks() / 1000.0, self.world.tiles, self.world.flow)
     
-    def _patrol(self, dt: float):
-        """Patrol behavior - move back and forth"""
-        if self.position.x <= self.patrol_start_x - self.patrol_range:
-            self.direction = 1
-        elif self.position.x >= self.patrol_start_x + self.patrol_range:
-            self.direction = -1
+    def shoot_at(self, player_pos: Vector2, projectiles: List, current_time: float,
+                 angles: Sequence[float] = (0.0,)):
+        """Attack behavior - shoot at player, one projectile per angle offset (radians)"""
+        # Import here to avoid circular imports
+        from projectile import Projectile
         
-        self.velocity.x = self.speed * self.direction * 0.5  # Slower patrol speed
-    
-    def _chase_player(self, player_pos: Vector2, dt: float):
-        """Chase behavior - move towards player"""
+        # Shoot at player
         direction_to_player = (player_pos - self.position).normalize()
-        self.velocity.x = direction_to_player.x * self.speed
-        self.direction = 1 if direction_to_player.x > 0 else -1
-    
-    def _attack_player(self, player_pos: Vector2, dt: float, projectiles: List):
-        """Attack behavior - shoot at player"""
-        current_time = pygame.time.get_ticks() / 1000.0
+        aim = math.atan2(direction_to_player.y, direction_to_player.x)
         
-        if current_time - self.last_shot_time >= self.shoot_cooldown:
-            # Import here to avoid circular imports
-            from projectile import Projectile
-            
-            # Shoot at player
-            direction_to_player = (player_pos - self.position).normalize()
-            
-            # Create projectile
+        # Create projectiles
+        for angle in angles:
             projectile = Projectile(
                 self.position.x, self.position.y - self.height // 2,
-                direction_to_player, 200, self.damage,
+                Vector2(math.cos(aim + angle), math.sin(aim + angle)) if angle else direction_to_player,
+                200, self.damage,
                 EntityType.ENEMY_SOLDIER if self.enemy_type == 'soldier' else EntityType.ENEMY_ARCHER,
-                RED if self.enemy_type != 'boss' else ORANGE
+                RED if self.enemy_type != 'boss' else ORANGE, self.world
             )
             projectiles.append(projectile)
-            self.last_shot_time = current_time
-        
-        # Stop moving when attacking
-        self.velocity.x = 0
+        self.last_shot_time = current_time
     
-    def _apply_physics(self, dt: float):
-        """Apply gravity and movement"""
-        # Apply gravity
-        if not self.on_ground:
-            self.velocity.y += self.gravity * dt
-        
-        # Update position
-        self.position.x += self.velocity.x * dt
-        self.position.y += self.velocity.y * dt
-        
-        # Simple ground collision (assume ground at y = 600)
-        if self.position.y >= 600:
-            self.position.y = 600
-            self.velocity.y = 0
-            self.on_ground = True
-        else:
-            self.on_ground = False
+    def follow_plan(self, plan: BossPlan, player_pos: Vector2, projectiles: List, current_time: float):
+        """Act on a plan from the boss planner instead of the state machine's decision"""
+        self.velocity.x = plan.direction * self.speed
+        if plan.direction:
+            self.direction = plan.direction
+        
+        # A planned jump is taken once
+        if plan.jump and self.on_ground:
+            self.velocity.y = self.jump_speed
+            plan.jump = False
+        
+        if (plan.shots and (player_pos - self.position).magnitude() <= self.detection_range
+                and current_time - self.last_shot_time >= self.shoot_cooldown):
+            self.shoot_at(player_pos, projectiles, current_time, plan.shots)
     
     def take_damage(self, damage: int) -> bool:
         """Take damage and return True if enemy is defeated"""
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Flow-Field Pathfinding for Wild Defender Game
+=============================================
+
+One shared map of moves toward the player instead of a path search per enemy.
+Enemies walk on the tile map and can jump about one tile, so the field is
+computed over the cells an enemy can stand in (an open cell above a floor
+tile), with walking, dropping off ledges and one-tile jumps as the moves.
+
+The move graph depends only on the level and is built once. Each time the
+player enters a different cell, a breadth-first search over the reversed moves
+records, for every standing cell, the first move of a shortest path to the
+player. A chasing enemy then just looks up the cell it is in.
+"""
+
+import math
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from tilemap import TileMap
+
+class FlowField:
+    """Next move toward the player for every cell of a tile map"""
+    
+    def __init__(self, tiles: TileMap):
+        self.tiles = tiles
+        rows, columns = tiles.rows, tiles.columns
+        self.target: Optional[int] = None  # cell index the field points to
+        self.updates = 0  # number of times the field was recomputed
+        
+        # Cells an enemy can stand in: open, with a floor tile right below
+        passable = ~tiles.solid
+        standable = passable.copy()
+        standable[:-1] &= tiles.floor[1:]
+        standable[-1] = False
+        
+        # Standing cell reached by falling from every cell; `rows` (a row of
+        # nothing) inside solid tiles and above bottomless columns
+        self.landing = np.full((rows, columns), rows, dtype=np.intp)
+        for row in range(rows - 1, -1, -1):
+            below = self.landing[row + 1] if row + 1 < rows else rows
+            self.landing[row] = np.where(standable[row], row, np.where(passable[row], below, rows))
+        self._landing_rows: List[List[int]] = self.landing.tolist()  # for single-cell lookups
+        
+        # Moves into every standing cell: source cell, horizontal direction, jump
+        self.sources: Dict[int, List[Tuple[int, int, bool]]] = {}
+        for row, column in zip(*(index.tolist() for index in standable.nonzero())):
+            source = row * columns + column
+            for step in (-1, 1):
+                side = column + step
+                # Walk sideways, dropping down to whatever floor is below
+                if 0 <= side < columns and passable[row, side] and self._landing_rows[row][side] < rows:
+                    self._add_move(self._landing_rows[row][side] * columns + side, source, step, False)
+            for step in (-1, 0, 1):
+                side = column + step
+                # Jump one tile up, onto a block or a platform, when there is headroom
+                if row > 0 and passable[row - 1, column] and 0 <= side < columns and standable[row - 1, side]:
+                    self._add_move((row - 1) * columns + side, source, step, True)
+        
+        # Per cell: direction of the next move (-1, 0, 1) and whether it is a jump;
+        # the extra row answers for cells without a standing cell below
+        self.direction = np.zeros((rows + 1, columns), dtype=np.int8)
+        self.jump = np.zeros((rows + 1, columns), dtype=bool)
+    
+    def _add_move(self, target: int, source: int, step: int, jump: bool):
+        """Record a move from the source cell into the target cell"""
+        self.sources.setdefault(target, []).append((source, step, jump))
+    
+    def update(self, x: float, y: float) -> bool:
+        """Point the field at the player's standing cell; return whether it had to be recomputed"""
+        tiles = self.tiles
+        column = min(max(math.floor(x / tiles.tile_size), 0), tiles.columns - 1)
+        row = min(max(math.ceil(y / tiles.tile_size) - 1, 0), tiles.rows - 1)
+        row = self._landing_rows[row][column]
+        if row == tiles.rows:
+            return False  # inside a wall or over a pit: keep the last field
+        target = row * tiles.columns + column
+        if target == self.target:
+            return False
+        
+        # Breadth-first search backwards from the player over the moves into each cell
+        self.target = target
+        self.updates += 1
+        sources = self.sources
+        queue = [target]  # visited cells in search order; the loop below walks it as it grows
+        seen = {target}
+        directions, jumps = [], []
+        for cell in queue:
+            for source, step, jump in sources.get(cell, ()):
+                if source not in seen:
+                    seen.add(source)
+                    queue.append(source)
+                    directions.append(step)
+                    jumps.append(jump)
+        
+        cells = queue[1:]
+        self.direction.fill(0)
+        self.jump.fill(False)
+        self.direction.flat[cells] = directions
+        self.jump.flat[cells] = jumps
+        return True
+    
+    def reset(self):
+        """Forget the target cell, so the next update() recomputes the field"""
+        self.target = None
+    
+    def steer(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Next move of characters with their feet at (x, y): direction (0 = here or unreachable) and jump flags"""
+        tiles = self.tiles
+        column = (x // tiles.tile_size).astype(np.intp).clip(0, tiles.columns - 1)
+        row = (np.ceil(y / tiles.tile_size) - 1).astype(np.intp).clip(0, tiles.rows - 1)
+        row = self.landing[row, column]
+        return self.direction[row, column], self.jump[row, column]
+    
+    def steer_at(self, x: float, y: float) -> Tuple[int, bool]:
+        """steer() for a single character"""
+        tiles = self.tiles
+        column = min(max(int(x // tiles.tile_size), 0), tiles.columns - 1)
+        row = min(max(math.ceil(y / tiles.tile_size) - 1, 0), tiles.rows - 1)
+        row = self._landing_rows[row][column]
+        return int(self.direction[row, column]), bool(self.jump[row, column])
@@ -19,9 +19,18 @@ Features:
 - Dynamic camera following the player smoothly
 """
 
+# Time every startup phase from here on (reported by --profile-startup)
+from startup import StartupProfiler
+startup = StartupProfiler()
+
 import pygame
+startup.mark("import pygame")
 import sys
-from typing import List
+import time
+import argparse
+import logging
+from contextlib import nullcontext
+from typing import Dict, List, Optional
 
 # Import our custom modules
 from constants import *
@@ -31,20 +40,54 @@ from projectile import Projectile
 from collectible import Collectible
 from enemy import Enemy
 from player import Player
+from ecs import World
+from tilemap import TileMap, SOLID, PLATFORM
+from flowfield import FlowField
+from systems import (
+    GROUND_Y, update_projectiles, update_collectibles,
+    character_boxes, projectile_boxes, collectible_boxes, select_boxes, overlapping_pairs, overlapping_rows
+)
+from telemetry import Telemetry
+from gcpolicy import GCPolicy
+from alloctrace import AllocationTracker
+from snapshot import pack_game, unpack_game
+from levelloader import LevelLoader, PreparedLevel
+from particles import ParticleSystem, QUALITY_PRESETS
+from aischeduler import AIScheduler
+from bossplanner import BossPlanner
+startup.mark("import game modules")
 
-# Initialize Pygame
-pygame.init()
+# Stands in for allocation tracker sections when allocations are not traced
+UNTRACED = nullcontext()
 
 class Game:
     """Main game class managing all game systems"""
     
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Wild Defender - Animal vs Humans")
+    def __init__(self, telemetry_path: Optional[str] = None, telemetry_interval: float = 5.0,
+                 trace_allocations: int = 0, headless: bool = False, tuning: Optional[Dict] = None,
+                 profile_startup: bool = False, particle_quality: Optional[str] = None,
+                 ai_budget_ms: Optional[float] = None, boss_planning: bool = False):
+        # Only the display (which brings the event queue) is initialized; audio and
+        # joysticks are never used. Headless games (simulations) need no display at all
+        # and render into an off-screen surface.
+        self.headless = headless
+        
+        # Bosses plan in a worker process, started before the display is initialized
+        self.boss_planner = BossPlanner() if boss_planning else None
+        
+        if headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            pygame.display.init()
+            startup.mark("display init")
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Wild Defender - Animal vs Humans")
+            startup.mark("display mode")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.large_font = pygame.font.Font(None, 72)
+        self.profile_startup = profile_startup
+        
+        # Fonts are loaded on first use (see the font properties)
+        self._fonts: Dict[int, pygame.font.Font] = {}
         
         # Game state
         self.state = GameState.MENU
@@ -52,6 +95,11 @@ class Game:
         self.max_level = 3
         self.score = 0
         self.paused = False
+        self.game_time = 0.0  # Seconds of gameplay, drives all cooldowns
+        self.quick_save: Optional[bytes] = None  # Game.snapshot() taken with F5
+        
+        # Balancing overrides: {'enemies': {type: {stat: value}}, 'player': {...}, 'collectibles': {type: value}}
+        self.tuning = tuning or {}
         
         # World settings
         self.world_width = 3000
@@ -60,12 +108,34 @@ class Game:
         # Initialize camera
         self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
         
-        # Initialize game objects
-        self.player = Player(100, 600)
+        # Initialize game objects (their data lives in the ECS world)
+        self.world = World()
+        self.player = self._create_player()
         self.enemies: List[Enemy] = []
         self.projectiles: List[Projectile] = []
         self.collectibles: List[Collectible] = []
         
+        # Hit and death effects; headless games skip them unless asked for
+        self.particles = ParticleSystem(particle_quality or ('off' if headless else 'high'))
+        
+        # Enemy decisions, optionally limited to a time budget per frame (None = no limit)
+        self.ai_scheduler = AIScheduler(ai_budget_ms)
+        
+        # Optional performance telemetry
+        self.telemetry = Telemetry(telemetry_path, telemetry_interval) if telemetry_path else None
+        
+        # Garbage collection policy, installed by the main loop
+        self.gc_policy: Optional[GCPolicy] = None
+        
+        # Levels are prepared in the background while the level-complete screen is up
+        self.level_loader = LevelLoader(self._build_level)
+        self.backgrounds: Dict[int, pygame.Surface] = {}  # static background per level
+        self.tile_maps: Dict[int, TileMap] = {}  # collision and scenery tiles per level
+        self.background: Optional[pygame.Surface] = None
+        
+        # Debug allocation tracking (reports every N frames)
+        self.allocation_tracker = AllocationTracker(trace_allocations) if trace_allocations else None
+        
         # Level data
         self.level_data = {
             1: {
@@ -78,9 +148,15 @@ class Game:
                 'collectibles': [
                     {'type': 'health', 'x': 300, 'y': 570},
                     {'type': 'power', 'x': 1000, 'y': 570},
-                    {'type': 'life', 'x': 1800, 'y': 570},
+                    {'type': 'life', 'x': 1860, 'y': 490},
                 ],
-                'boss': {'type': 'boss', 'x': 2500, 'y': 600}
+                'boss': {'type': 'boss', 'x': 2500, 'y': 600},
+                'tiles': [
+                    {'type': 'platform', 'x': 920, 'y': 560, 'width': 160},
+                    {'type': 'platform', 'x': 1720, 'y': 560, 'width': 80},
+                    {'type': 'platform', 'x': 1800, 'y': 520, 'width': 120},
+                    {'type': 'block', 'x': 2000, 'y': 560, 'width': 40},
+                ]
             },
             2: {
                 'enemies': [
@@ -95,9 +171,16 @@ class Game:
                     {'type': 'health', 'x': 250, 'y': 570},
                     {'type': 'power', 'x': 750, 'y': 570},
                     {'type': 'health', 'x': 1350, 'y': 570},
-                    {'type': 'life', 'x': 2000, 'y': 570},
+                    {'type': 'life', 'x': 2140, 'y': 450},
                 ],
-                'boss': {'type': 'boss', 'x': 2700, 'y': 600}
+                'boss': {'type': 'boss', 'x': 2700, 'y': 600},
+                'tiles': [
+                    {'type': 'block', 'x': 1040, 'y': 560, 'width': 40},
+                    {'type': 'platform', 'x': 1920, 'y': 560, 'width': 80},
+                    {'type': 'platform', 'x': 2000, 'y': 520, 'width': 80},
+                    {'type': 'platform', 'x': 2080, 'y': 480, 'width': 120},
+                    {'type': 'block', 'x': 2320, 'y': 560, 'width': 40},
+                ]
             },
             3: {
                 'enemies': [
@@ -115,13 +198,48 @@ class Game:
                     {'type': 'power', 'x': 600, 'y': 570},
                     {'type': 'health', 'x': 1100, 'y': 570},
                     {'type': 'power', 'x': 1600, 'y': 570},
-                    {'type': 'life', 'x': 2200, 'y': 570},
+                    {'type': 'life', 'x': 2420, 'y': 410},
                 ],
-                'boss': {'type': 'boss', 'x': 2800, 'y': 600}
+                'boss': {'type': 'boss', 'x': 2800, 'y': 600},
+                'tiles': [
+                    {'type': 'block', 'x': 1880, 'y': 560, 'width': 40},
+                    {'type': 'platform', 'x': 2120, 'y': 560, 'width': 80},
+                    {'type': 'platform', 'x': 2200, 'y': 520, 'width': 80},
+                    {'type': 'platform', 'x': 2280, 'y': 480, 'width': 80},
+                    {'type': 'platform', 'x': 2360, 'y': 440, 'width': 120},
+                    {'type': 'block', 'x': 2560, 'y': 560, 'width': 80},
+                ]
             }
         }
         
         self.load_level(self.current_level)
+        # Headless games never show a first frame, so their startup ends here
+        if headless:
+            startup.finish("world and level")
+        else:
+            startup.mark("world and level")
+    
+    @property
+    def font(self) -> pygame.font.Font:
+        return self._font(36)
+    
+    @property
+    def small_font(self) -> pygame.font.Font:
+        return self._font(24)
+    
+    @property
+    def large_font(self) -> pygame.font.Font:
+        return self._font(72)
+    
+    def _font(self, size: int) -> pygame.font.Font:
+        """Return the default font at a size, initializing the font module on first use"""
+        font = self._fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self._fonts[size] = pygame.font.Font(None, size)
+            startup.mark(f"font {size}")
+        return font
     
     def load_level(self, level: int):
         """Load a specific level"""
@@ -130,31 +248,140 @@ class Game:
             self.state = GameState.GAME_OVER
             return
         
+        # Usually already prepared by the loader thread
+        prepared = self.level_loader.take(level)
         self.current_level = level
-        data = self.level_data[level]
         
         # Clear existing objects
-        self.enemies.clear()
-        self.projectiles.clear()
-        self.collectibles.clear()
+        self._clear_entities(self.enemies)
+        self._clear_entities(self.projectiles)
+        self._clear_entities(self.collectibles)
+        self.particles.clear()
+        if self.boss_planner:
+            self.boss_planner.reset()
+        
+        # Swap in the prepared world; only the player moves over from the old one
+        self.player.move_to(prepared.world)
+        self.world = prepared.world
+        self.enemies[:] = prepared.enemies
+        self.collectibles[:] = prepared.collectibles
+        
+        # Surfaces are only created here on the main thread; the loader builds plain data
+        tiles = prepared.world.tiles
+        if self.tile_maps.get(level) is not tiles:
+            tiles.render(self.screen)
+            self.tile_maps[level] = tiles
+        self.background = self.backgrounds.get(level)
+        if self.background is None:
+            self.background = self.backgrounds[level] = self._render_background()
         
         # Reset player position
         self.player.position = Vector2(100, 600)
         
-        # Load enemies
-        for enemy_data in data['enemies']:
-            enemy = Enemy(enemy_data['x'], enemy_data['y'], enemy_data['type'])
-            self.enemies.append(enemy)
-        
-        # Load boss
-        boss_data = data['boss']
-        boss = Enemy(boss_data['x'], boss_data['y'], boss_data['type'])
-        self.enemies.append(boss)
+        # Freeze the freshly loaded level so gameplay collections skip it (over the next idle frames)
+        if self.gc_policy:
+            self.gc_policy.after_level_load()
+    
+    def _build_level(self, level: int) -> PreparedLevel:
+        """Create a level's entities, tiles and flow field in a new world; safe to run on the loader thread
+
+        Nothing here touches a Surface or writes the game's caches: load_level()
+        pre-renders the tiles and background once the level is swapped in.
+        """
+        data = self.level_data[level]
+        world = World()
+        world.tiles = self.tile_maps.get(level) or self._build_tile_map(level)
+        world.flow = FlowField(world.tiles)
+        enemy_tuning = self.tuning.get('enemies', {})
+        
+        # Load enemies, boss last
+        enemies = [
+            Enemy(enemy_data['x'], enemy_data['y'], enemy_data['type'], world,
+                  enemy_tuning.get(enemy_data['type']))
+            for enemy_data in data['enemies'] + [data['boss']]
+        ]
         
         # Load collectibles
+        collectibles = []
         for collectible_data in data['collectibles']:
-            collectible = Collectible(collectible_data['x'], collectible_data['y'], collectible_data['type'])
-            self.collectibles.append(collectible)
+            collectible = Collectible(collectible_data['x'], collectible_data['y'], collectible_data['type'], world)
+            collectible.value = self.tuning.get('collectibles', {}).get(collectible.type, collectible.value)
+            collectibles.append(collectible)
+        return PreparedLevel(level, world, enemies, collectibles)
+    
+    def _attach_map(self, world: World, level: int):
+        """Give a world the level's tile map and a flow field over it"""
+        world.tiles = self._tile_map(level)
+        world.flow = FlowField(world.tiles)
+    
+    def _tile_map(self, level: int) -> TileMap:
+        """Return the tile map of a level, building and pre-rendering it on first use (main thread only)"""
+        tiles = self.tile_maps.get(level)
+        if tiles is None:
+            tiles = self._build_tile_map(level)
+            tiles.render(self.screen)
+            self.tile_maps[level] = tiles
+        return tiles
+    
+    def _build_tile_map(self, level: int) -> TileMap:
+        """Build a level's tile data: ground everywhere, then its blocks (down to the ground) and platforms"""
+        tiles = TileMap(self.world_width, self.world_height)
+        tiles.fill(SOLID, 0, GROUND_Y, self.world_width, self.world_height - GROUND_Y)
+        for tile_data in self.level_data[level].get('tiles', []):
+            if tile_data['type'] == 'block':
+                tiles.fill(SOLID, tile_data['x'], tile_data['y'], tile_data['width'], GROUND_Y - tile_data['y'])
+            else:
+                tiles.fill(PLATFORM, tile_data['x'], tile_data['y'], tile_data['width'], 1)
+        return tiles
+    
+    def _render_background(self) -> pygame.Surface:
+        """Pre-render the static part of the background: the sky gradient"""
+        # Same pixel format as the screen, so blitting it needs no conversion
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), 0, self.screen)
+        
+        # Sky gradient
+        for y in range(SCREEN_HEIGHT):
+            color_ratio = y / SCREEN_HEIGHT
+            r = int(135 * (1 - color_ratio) + 255 * color_ratio)
+            g = int(206 * (1 - color_ratio) + 255 * color_ratio)
+            b = int(235 * (1 - color_ratio) + 255 * color_ratio)
+            pygame.draw.line(background, (r, g, b), (0, y), (SCREEN_WIDTH, y))
+        return background
+    
+    def _create_player(self) -> Player:
+        """Create the player at the start of the level with any tuning applied"""
+        player = Player(100, 600, self.world)
+        for name, value in self.tuning.get('player', {}).items():
+            setattr(player, name, value)
+        return player
+    
+    def _clear_entities(self, entities: List):
+        """Destroy every entity in a list and empty it"""
+        for entity in entities:
+            entity.destroy()
+        entities.clear()
+    
+    def _remove_inactive(self, entities: List) -> int:
+        """Destroy inactive entities, compacting the list in place; return how many were removed"""
+        alive = 0
+        for entity in entities:
+            if entity.active:
+                entities[alive] = entity
+                alive += 1
+            else:
+                entity.destroy()
+        removed = len(entities) - alive
+        if removed:
+            del entities[alive:]
+        return removed
+    
+    def snapshot(self) -> bytes:
+        """Pack the complete game state into a compact binary buffer"""
+        return pack_game(self)
+    
+    def restore(self, blob: bytes):
+        """Restore a state captured by snapshot()"""
+        unpack_game(self, blob)
     
     def handle_events(self):
         """Handle all game events"""
@@ -171,9 +398,17 @@ class Game:
                 elif self.state == GameState.PLAYING:
                     if event.key == pygame.K_ESCAPE:
                         self.state = GameState.PAUSED
+                    elif event.key == pygame.K_F5:
+                        # Quick-save to memory
+                        self.quick_save = self.snapshot()
+                    elif event.key == pygame.K_F9 and self.quick_save:
+                        self.restore(self.quick_save)
                     elif event.key == pygame.K_x:
                         # Shoot
-                        self.player.shoot(self.projectiles)
+                        projectile_count = len(self.projectiles)
+                        self.player.shoot(self.projectiles, self.game_time)
+                        if self.telemetry:
+                            self.telemetry.count('projectiles_spawned', len(self.projectiles) - projectile_count)
                 
                 elif self.state == GameState.PAUSED:
                     if event.key == pygame.K_ESCAPE:
@@ -197,75 +432,122 @@ class Game:
         """Restart the game"""
         self.current_level = 1
         self.score = 0
-        self.player = Player(100, 600)
+        self.player.destroy()
+        self.player = self._create_player()
         self.load_level(1)
         self.state = GameState.PLAYING
     
-    def update(self, dt: float):
+    def update(self, dt: float, keys_pressed=None):
         """Update all game systems"""
         if self.state == GameState.PLAYING:
-            keys_pressed = pygame.key.get_pressed()
+            self.game_time += dt
+            if keys_pressed is None:
+                keys_pressed = pygame.key.get_pressed()
             
             # Update player
-            self.player.update(dt, keys_pressed)
+            with self._section('player'):
+                self.player.update(dt, keys_pressed)
             
             # Update camera to follow player
             self.camera.update(self.player.position.x, self.player.position.y, 
                              self.world_width, self.world_height)
             
-            # Update enemies
-            for enemy in self.enemies[:]:
-                enemy.update(dt, self.player.position, self.projectiles)
-                if not enemy.active:
-                    self.enemies.remove(enemy)
-                    self.score += 100  # Points for defeating enemy
+            # Update enemies (defeated ones are removed first)
+            self.score += 100 * self._remove_inactive(self.enemies)  # Points for defeating enemy
+            projectile_count = len(self.projectiles)
+            if self.boss_planner:
+                with self._section('bossplanner'):
+                    self.boss_planner.update(self.game_time, self.enemies, self.player, self.projectiles)
+            with self._section('aischeduler'):
+                self.ai_scheduler.update(self.world, dt, self.player.position, self.projectiles, self.game_time,
+                                         self.boss_planner)
+            if self.telemetry:
+                self.telemetry.count('projectiles_spawned', len(self.projectiles) - projectile_count)
+                self.telemetry.count('ai_decisions', self.ai_scheduler.decisions)
+                self.telemetry.record_ai(self.ai_scheduler.queue_depth, self.ai_scheduler.latency)
             
-            # Update projectiles
-            for projectile in self.projectiles[:]:
-                projectile.update(dt)
-                if not projectile.active:
-                    self.projectiles.remove(projectile)
-            
-            # Update collectibles
-            for collectible in self.collectibles[:]:
-                collectible.update(dt)
-                if not collectible.active:
-                    self.collectibles.remove(collectible)
+            # Update projectiles and collectibles
+            with self._section('systems'):
+                update_projectiles(self.world, dt)
+                self._remove_inactive(self.projectiles)
+                update_collectibles(self.world, dt)
+                self._remove_inactive(self.collectibles)
             
             # Check collisions
-            self.check_collisions()
+            with self._section('collisions'):
+                self.check_collisions()
+            
+            # Update particle effects
+            with self._section('particles'):
+                self.particles.update(dt)
             
             # Check level completion
             if not self.enemies:
                 self.state = GameState.LEVEL_COMPLETE
                 self.score += 1000  # Bonus for completing level
+                
+                # Prepare the next level while the level-complete screen is shown; headless
+                # games load it straight away, so a loader thread would only compete for the GIL
+                if self.current_level < self.max_level and not self.headless:
+                    self.level_loader.prefetch(self.current_level + 1)
             
             # Check game over
             if self.player.lives <= 0:
                 self.state = GameState.GAME_OVER
     
+    def _section(self, name: str):
+        """Attribute transient allocations of a part of the frame to name when tracing allocations"""
+        return self.allocation_tracker.section(name) if self.allocation_tracker else UNTRACED
+    
     def check_collisions(self):
         """Check all collision interactions"""
+        tests = 0
+        player_rect = self.player.rect
+        player_shot = EntityType.PLAYER.value
+        
+        # Bounding boxes are computed once per archetype and shared by every test below
+        enemy_groups = [(targets, character_boxes(targets)) for targets in self.world.query('ai')]
+        projectile_groups = [(shots, projectile_boxes(shots), shots.view('projectile')[:, 1].tolist())
+                             for shots in self.world.query('projectile')]
+        
         # Player projectiles vs enemies
-        for projectile in self.projectiles[:]:
-            if projectile.owner_type == EntityType.PLAYER:
-                for enemy in self.enemies[:]:
-                    if enemy.active and projectile.check_collision(enemy.rect):
-                        if enemy.take_damage(projectile.damage):
-                            self.score += 50  # Bonus for hitting enemy
-                        projectile.active = False
-                        break
+        for shots, boxes, owners in projectile_groups:
+            player_rows = [row for row, owner in enumerate(owners) if owner == player_shot]
+            if not player_rows:
+                continue
+            shot_boxes = select_boxes(boxes, player_rows)
+            for targets, target_boxes in enemy_groups:
+                tests += len(player_rows) * targets.count
+                for index, columns in overlapping_pairs(shot_boxes, target_boxes):
+                    projectile = shots.owners[player_rows[index]]
+                    for column in columns:
+                        enemy = targets.owners[column]
+                        if projectile.active and enemy.active:
+                            self.particles.emit(projectile.position.x, projectile.position.y, 12, projectile.color)
+                            if enemy.take_damage(projectile.damage):
+                                self.score += 50  # Bonus for hitting enemy
+                                self.particles.emit(enemy.position.x, enemy.position.y - enemy.height / 2,
+                                                    80, enemy.color, speed=250.0, life=1.0)
+                            projectile.active = False
+                            break
         
         # Enemy projectiles vs player
-        for projectile in self.projectiles[:]:
-            if (projectile.owner_type in [EntityType.ENEMY_SOLDIER, EntityType.ENEMY_ARCHER] and
-                projectile.check_collision(self.player.rect)):
-                self.player.take_damage(projectile.damage)
-                projectile.active = False
+        for shots, boxes, owners in projectile_groups:
+            tests += shots.count
+            for row in overlapping_rows(boxes, player_rect):
+                projectile = shots.owners[row]
+                if projectile.active and owners[row] != player_shot:
+                    self.particles.emit(projectile.position.x, projectile.position.y, 12, projectile.color)
+                    self.player.take_damage(projectile.damage)
+                    projectile.active = False
         
         # Player vs collectibles
-        for collectible in self.collectibles[:]:
-            if collectible.active and collectible.rect.colliderect(self.player.rect):
+        for items in self.world.query('animation'):
+            tests += items.count
+            for row in overlapping_rows(collectible_boxes(items), player_rect):
+                collectible = items.owners[row]
+                if not collectible.active:
+                    continue
                 if collectible.type == 'health':
                     self.player.heal(collectible.value)
                     self.score += 10
@@ -278,36 +560,35 @@ class Game:
                 collectible.collect()
         
         # Player vs enemies (melee damage)
-        for enemy in self.enemies:
-            if enemy.active and enemy.rect.colliderect(self.player.rect):
-                # Simple melee damage (once per second)
-                current_time = pygame.time.get_ticks() / 1000.0
-                if not hasattr(enemy, 'last_melee_time'):
-                    enemy.last_melee_time = 0
+        for targets, boxes in enemy_groups:
+            tests += targets.count
+            for row in overlapping_rows(boxes, player_rect):
+                enemy = targets.owners[row]
+                if not enemy.active:
+                    continue
                 
-                if current_time - enemy.last_melee_time >= 1.0:
+                # Simple melee damage (once per second)
+                if self.game_time - enemy.last_melee_time >= 1.0:
                     self.player.take_damage(enemy.damage // 2)
-                    enemy.last_melee_time = current_time
+                    enemy.last_melee_time = self.game_time
+        
+        if self.telemetry:
+            self.telemetry.count('collisions_tested', tests)
     
     def draw_background(self):
         """Draw game background"""
-        # Sky gradient
-        for y in range(SCREEN_HEIGHT):
-            color_ratio = y / SCREEN_HEIGHT
-            r = int(135 * (1 - color_ratio) + 255 * color_ratio)
-            g = int(206 * (1 - color_ratio) + 255 * color_ratio)
-            b = int(235 * (1 - color_ratio) + 255 * color_ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-        
-        # Ground
-        ground_y = SCREEN_HEIGHT - 200
-        pygame.draw.rect(self.screen, BROWN, (0, ground_y, SCREEN_WIDTH, 200))
+        # The sky is pre-rendered with the level
+        self.screen.blit(self.background, (0, 0))
         
         # Simple hills in background
+        ground_y = SCREEN_HEIGHT - 200
         for i in range(5):
             hill_x = i * 300 - int(self.camera.x * 0.5) % 1500
             hill_y = ground_y - 50
             pygame.draw.circle(self.screen, DARK_GREEN, (hill_x, hill_y), 80)
+        
+        # Ground, blocks and platforms, from the chunks the camera can see
+        self.world.tiles.draw(self.screen, self.camera)
     
     def draw_ui(self):
         """Draw user interface elements"""
@@ -473,9 +754,15 @@ class Game:
             for collectible in self.collectibles:
                 collectible.draw(self.screen, self.camera)
             
+            self.particles.draw(self.screen, self.camera)
+            
             # Draw UI
             self.draw_ui()
             
+            if self.telemetry:
+                # The player and every game object handed to draw this frame
+                self.telemetry.count('objects_drawn', 1 + len(self.enemies) + len(self.projectiles) + len(self.collectibles))
+            
             # Draw overlays
             if self.state == GameState.PAUSED:
                 self.draw_pause_screen()
@@ -485,27 +772,85 @@ class Game:
         elif self.state == GameState.GAME_OVER:
             self.draw_game_over()
         
-        pygame.display.flip()
+        # Headless games draw into an off-screen surface that is never shown
+        if not self.headless:
+            pygame.display.flip()
     
     def run(self):
         """Main game loop"""
         running = True
+        self.gc_policy = GCPolicy(1.0 / FPS)
+        self.gc_policy.after_level_load()
+        if self.allocation_tracker:
+            self.allocation_tracker.start()
         
         while running:
             dt = self.clock.tick(FPS) / 1000.0  # Delta time in seconds
+            frame_start = time.perf_counter()
+            if self.allocation_tracker:
+                self.allocation_tracker.begin_frame()
             
             # Handle events
             running = self.handle_events()
             
+            # No automatic collections while playing
+            self.gc_policy.set_gameplay(self.state == GameState.PLAYING)
+            
             # Update game
             self.update(dt)
             
             # Draw everything
-            self.draw()
-        
+            with self._section('draw'):
+                self.draw()
+            if not startup.finished:
+                startup.finish("first frame")
+                if self.profile_startup:
+                    startup.report()
+            
+            if self.allocation_tracker:
+                self.allocation_tracker.end_frame()
+            
+            # Collect young garbage in whatever is left of the frame budget
+            self.gc_policy.use_idle_time(time.perf_counter() - frame_start)
+            
+            if self.telemetry:
+                self.telemetry.set_entities_alive(len(self.world))
+                self.telemetry.record_frame(dt, time.perf_counter() - frame_start)
+        
+        self.gc_policy.close()
+        if self.allocation_tracker:
+            self.allocation_tracker.stop()
+        if self.telemetry:
+            self.telemetry.close()
+        if self.boss_planner:
+            self.boss_planner.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Wild Defender - Animal vs Humans")
+    parser.add_argument('--telemetry', metavar='PATH',
+                        help="write frame-time telemetry to a .csv or .jsonl file")
+    parser.add_argument('--telemetry-interval', type=float, default=5.0, metavar='SECONDS',
+                        help="seconds between telemetry flushes (default: 5)")
+    parser.add_argument('--trace-alloc', type=int, nargs='?', const=60, default=0, metavar='FRAMES',
+                        help="report per-frame allocations by module every FRAMES frames (default: 60)")
+    parser.add_argument('--verbose', action='store_true',
+                        help="log diagnostics such as full garbage collections")
+    parser.add_argument('--particles', choices=list(QUALITY_PRESETS), default='high',
+                        help="particle effect quality, capping the number of live particles (default: high)")
+    parser.add_argument('--ai-budget', type=float, default=2.0, metavar='MS',
+                        help="milliseconds per frame for enemy decisions; the rest wait a frame (default: 2)")
+    parser.add_argument('--no-boss-planner', action='store_true',
+                        help="drive bosses by the state machine alone instead of worker-process planning")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print an import/initialization timing breakdown up to the first frame")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(name)s: %(message)s")
+    
+    game = Game(telemetry_path=args.telemetry, telemetry_interval=args.telemetry_interval,
+                trace_allocations=args.trace_alloc, profile_startup=args.profile_startup, particle_quality=args.particles,
+                ai_budget_ms=args.ai_budget, boss_planning=not args.no_boss_planner)
     game.run()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Garbage Collection Policy for Wild Defender Game
+=================================================
+
+Keeps cyclic garbage collection out of the middle of frames. Long-lived level
+objects are frozen once a level has loaded (collecting one generation per idle
+frame first), automatic collection is disabled during gameplay, and young
+generations are collected in the idle time left over in each frame's budget.
+"""
+
+import gc
+import time
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class GCPolicy:
+    """Schedules garbage collection into idle frame time"""
+    
+    def __init__(self, frame_budget: float, min_idle: float = 0.001, max_deferred_frames: int = 120):
+        self.frame_budget = frame_budget
+        self.min_idle = min_idle
+        self.max_deferred_frames = max_deferred_frames
+        self.gameplay = False
+        self.gen2_collections = 0
+        
+        # Estimated cost of collecting each generation (seconds)
+        self.estimated_cost = [0.0002, 0.001, 0.01]
+        self._collect_start = 0.0
+        
+        # Generation to collect next before freezing a loaded level (None = nothing pending)
+        self.settle_generation: Optional[int] = None
+        self.settle_wait = 0
+        
+        gc.callbacks.append(self._on_collect)
+    
+    def after_level_load(self):
+        """Collect everything over the next idle frames, then move survivors out of the collector's reach"""
+        # Cycles left over from the previous level become collectable again (cheap: no traversal)
+        gc.unfreeze()
+        self.settle_generation = 0
+        self.settle_wait = 0
+    
+    def set_gameplay(self, active: bool):
+        """Disable automatic collection while the game is being played"""
+        if active == self.gameplay:
+            return
+        
+        self.gameplay = active
+        if active:
+            gc.disable()
+        else:
+            gc.enable()
+    
+    def use_idle_time(self, frame_elapsed: float):
+        """Run young-generation collections if they fit in the remaining frame budget"""
+        idle = self.frame_budget - frame_elapsed
+        if self.settle_generation is not None:
+            self._settle_level(idle)
+            return
+        if not self.gameplay:
+            return
+        
+        count0, count1, _ = gc.get_count()
+        threshold0, threshold1, _ = gc.get_threshold()
+        
+        if count1 >= threshold1 and idle - self.min_idle >= self.estimated_cost[1]:
+            gc.collect(1)
+        elif count0 >= threshold0 and idle - self.min_idle >= self.estimated_cost[0]:
+            gc.collect(0)
+        elif count0 >= threshold0 * 20:
+            # No idle time for a long while; collect anyway rather than grow unbounded
+            gc.collect(0)
+    
+    def _settle_level(self, idle: float):
+        """Collect one more generation after a level load if it fits, and freeze after the full one
+        
+        Young generations are forced after max_deferred_frames without idle time;
+        the full collection never is during gameplay, it waits for idle time or a
+        menu, pause or level-complete screen.
+        """
+        generation = self.settle_generation
+        self.settle_wait += 1
+        if idle - self.min_idle < self.estimated_cost[generation]:
+            overdue = self.settle_wait >= self.max_deferred_frames
+            if not overdue or (generation == 2 and self.gameplay):
+                return
+        
+        gc.collect(generation)
+        self.settle_wait = 0
+        if generation < 2:
+            self.settle_generation = generation + 1
+        else:
+            gc.freeze()
+            self.settle_generation = None
+    
+    def close(self):
+        """Restore the default collector behaviour"""
+        if self._on_collect in gc.callbacks:
+            gc.callbacks.remove(self._on_collect)
+        gc.unfreeze()
+        gc.enable()
+        self.gameplay = False
+        self.settle_generation = None
+    
+    def _on_collect(self, phase: str, info: dict):
+        """Measure every collection and log full (generation 2) collections"""
+        if phase == 'start':
+            self._collect_start = time.perf_counter()
+            return
+        
+        duration = time.perf_counter() - self._collect_start
+        generation = info['generation']
+        
+        # Smooth the cost estimate used to decide what fits in idle time
+        self.estimated_cost[generation] = self.estimated_cost[generation] * 0.8 + duration * 0.2
+        
+        if generation == 2:
+            self.gen2_collections += 1
+            # Full collections scheduled after a level load are expected
+            level = logging.WARNING if self.gameplay and self.settle_generation is None else logging.INFO
+            logger.log(level, "gen-2 collection took %.2f ms (collected %d, uncollectable %d)",
+                       duration * 1000, info['collected'], info['uncollectable'])
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Level Preloading for Wild Defender Game
+=======================================
+
+Builds levels off the main thread. While the level-complete overlay is shown,
+the next level's entities, tile map and flow field are built in a fresh ECS
+World on a background thread; pressing ENTER then only swaps the prepared state
+in, so loading a level no longer causes a frame hitch. Surfaces are never
+touched off the main thread: the game pre-renders the tiles and background
+when it swaps the level in.
+"""
+
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+from ecs import World
+
+@dataclass
+class PreparedLevel:
+    """Everything a level needs, built outside the live game"""
+    level: int
+    world: World
+    enemies: List
+    collectibles: List
+
+class LevelLoader:
+    """Prepares levels on short-lived background threads"""
+    
+    def __init__(self, build: Callable[[int], PreparedLevel]):
+        self.build = build
+        self.pending: Dict[int, Future] = {}
+    
+    def prefetch(self, level: int):
+        """Start preparing a level in the background unless that is already under way"""
+        if level in self.pending:
+            return
+        future = Future()
+        self.pending[level] = future
+        threading.Thread(target=self._prepare, args=(level, future),
+                         name=f'level-loader-{level}', daemon=True).start()
+    
+    def take(self, level: int) -> PreparedLevel:
+        """Return a prepared level, waiting for the loader (or building it now) if needed"""
+        future = self.pending.pop(level, None)
+        if future is None:
+            return self.build(level)
+        return future.result()
+    
+    def _prepare(self, level: int, future: Future):
+        """Loader thread: build a level and hand it (or the error) to the main thread"""
+        try:
+            future.set_result(self.build(level))
+        except BaseException as error:
+            future.set_exception(error)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Particle System for Wild Defender Game
+======================================
+
+Impact and death effects. Particles live in fixed-capacity NumPy arrays, never
+as Python objects: live particles are packed at the front of the arrays, every
+update moves all of them at once and compacts away the expired ones, and drawing
+writes them straight into the screen pixels through a surfarray view.
+"""
+
+import pygame
+import numpy as np
+from typing import Optional, Tuple
+from camera import Camera
+
+# Maximum live particles per quality setting
+QUALITY_PRESETS = {
+    'off': 0,
+    'low': 2000,
+    'medium': 8000,
+    'high': 20000,
+}
+
+class ParticleSystem:
+    """Pool of short-lived coloured particles"""
+    
+    def __init__(self, quality: str = 'high', gravity: float = 400.0, seed: Optional[int] = None):
+        self.quality = quality
+        self.capacity = QUALITY_PRESETS[quality]
+        self.gravity = gravity
+        self.count = 0
+        
+        # Cosmetic only, so it has its own random stream and never affects gameplay
+        self.random = np.random.default_rng(seed)
+        
+        self.position = np.zeros((self.capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((self.capacity, 2), dtype=np.float32)
+        self.life = np.zeros(self.capacity, dtype=np.float32)
+        self.color = np.zeros((self.capacity, 3), dtype=np.uint8)
+    
+    def emit(self, x: float, y: float, count: int, color: Tuple[int, int, int],
+             speed: float = 150.0, life: float = 0.6):
+        """Burst of particles flying out of a point in random directions"""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        
+        start, stop = self.count, self.count + count
+        angle = self.random.uniform(0.0, 2 * np.pi, count)
+        magnitude = self.random.uniform(0.3, 1.0, count) * speed
+        self.position[start:stop] = (x, y)
+        self.velocity[start:stop, 0] = np.cos(angle) * magnitude
+        self.velocity[start:stop, 1] = np.sin(angle) * magnitude
+        self.life[start:stop] = self.random.uniform(0.5, 1.0, count) * life
+        self.color[start:stop] = color
+        self.count = stop
+    
+    def update(self, dt: float):
+        """Move every particle and cull the expired ones"""
+        live = self.count
+        if not live:
+            return
+        
+        self.velocity[:live, 1] += self.gravity * dt
+        self.position[:live] += self.velocity[:live] * dt
+        self.life[:live] -= dt
+        
+        # Compact the survivors to the front of the arrays
+        alive = self.life[:live] > 0
+        if not alive.all():
+            rows = alive.nonzero()[0]
+            self.count = len(rows)
+            for array in (self.position, self.velocity, self.life, self.color):
+                array[:self.count] = array[rows]
+    
+    def clear(self):
+        """Remove all particles"""
+        self.count = 0
+    
+    def draw(self, screen: pygame.Surface, camera: Camera):
+        """Draw every visible particle as a 2x2 block in one batched pixel write"""
+        live = self.count
+        if not live:
+            return
+        
+        x = (self.position[:live, 0] - camera.x).astype(np.intp)
+        y = (self.position[:live, 1] - camera.y).astype(np.intp)
+        width, height = screen.get_size()
+        visible = (x >= 0) & (x < width - 1) & (y >= 0) & (y < height - 1)
+        x, y, color = x[visible], y[visible], self.color[:live][visible]
+        
+        pixels = pygame.surfarray.pixels3d(screen)
+        pixels[x, y] = color
+        pixels[x + 1, y] = color
+        pixels[x, y + 1] = color
+        pixels[x + 1, y + 1] = color
+        del pixels  # unlock the screen
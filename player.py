@@ -7,18 +7,31 @@ Handles player character with movement, combat, and state management.
 """
 
 import pygame
-from typing import List
+from typing import List, Optional
 from utils import Vector2
 from camera import Camera
 from constants import (
     GREEN, YELLOW, ORANGE, BLACK,
     EntityType
 )
+from ecs import Entity, World, Field, VectorField
+from systems import apply_physics
 
-class Player:
+class Player(Entity):
     """Player class with movements, speed, jump, health, lives, and shooting"""
     
-    def __init__(self, x: float, y: float):
+    components = ('position', 'velocity', 'health', 'collider', 'physics', 'renderable')
+    position = VectorField('position')
+    velocity = VectorField('velocity')
+    health = Field('health', 0, int)
+    max_health = Field('health', 1, int)
+    width = Field('collider', 0, int)
+    height = Field('collider', 1, int)
+    gravity = Field('physics', 0)
+    on_ground = Field('physics', 1, bool)
+    
+    def __init__(self, x: float, y: float, world: Optional[World] = None):
+        super().__init__(world)
         self.position = Vector2(x, y)
         self.velocity = Vector2(0, 0)
         self.max_health = 100
@@ -31,12 +44,15 @@ class Player:
         self.on_ground = False
         self.width = 35
         self.height = 45
-        self.rect = pygame.Rect(x - self.width//2, y - self.height, self.width, self.height)
         self.direction = 1  # 1 for right, -1 for left
         self.last_shot_time = 0
         self.shoot_cooldown = 0.3
         self.power_up_timer = 0
         self.has_power_up = False
+        self.power_up_duration = 10.0
+        self.power_up_damage = 40
+        self.damage_taken = 0
+        self.deaths = 0  # lives lost, unaffected by extra lives picked up
         
         # Animation states
         self.is_running = False
@@ -45,19 +61,18 @@ class Player:
     
     def update(self, dt: float, keys_pressed):
         """Update player movement and state"""
-        # Reset movement
-        self.velocity.x = 0
+        # Handle horizontal movement (standing still without input)
+        velocity_x = 0
         self.is_running = False
-        
-        # Handle horizontal movement
         if keys_pressed[pygame.K_LEFT] or keys_pressed[pygame.K_a]:
-            self.velocity.x = -self.speed
+            velocity_x = -self.speed
             self.direction = -1
             self.is_running = True
         if keys_pressed[pygame.K_RIGHT] or keys_pressed[pygame.K_d]:
-            self.velocity.x = self.speed
+            velocity_x = self.speed
             self.direction = 1
             self.is_running = True
+        self.velocity.x = velocity_x
         
         # Handle jumping
         if (keys_pressed[pygame.K_SPACE] or keys_pressed[pygame.K_UP] or keys_pressed[pygame.K_w]) and self.on_ground:
@@ -76,36 +91,33 @@ class Player:
         
         # Update animation
         self.animation_time += dt
-        
-        # Update rectangle position
-        self.rect.centerx = int(self.position.x)
-        self.rect.bottom = int(self.position.y)
+    
+    @property
+    def rect(self) -> pygame.Rect:
+        """Bounding rectangle with the player's feet at its position"""
+        archetype, row = self.locate()
+        x, y = archetype.columns['position'][row].tolist()
+        width, height = map(int, archetype.columns['collider'][row].tolist())
+        return pygame.Rect(int(x) - width // 2, int(y) - height, width, height)
     
     def _apply_physics(self, dt: float):
         """Apply gravity and movement physics"""
-        # Apply gravity
-        if not self.on_ground:
-            self.velocity.y += self.gravity * dt
-        
-        # Update position
-        self.position.x += self.velocity.x * dt
-        self.position.y += self.velocity.y * dt
-        
-        # Simple ground collision (assume ground at y = 600)
-        if self.position.y >= 600:
-            self.position.y = 600
-            self.velocity.y = 0
-            self.on_ground = True
+        # Gravity, movement and ground collision are shared with enemies
+        archetype, row = self.locate()
+        apply_physics(archetype, slice(row, row + 1), dt, self.world.tiles)
+        if archetype.columns['physics'][row, 1]:
             self.is_jumping = False
-        else:
-            self.on_ground = False
         
         # Keep player in bounds (simple world boundaries)
-        self.position.x = max(20, min(self.position.x, 2980))
+        position = archetype.columns['position']
+        x = position[row, 0]
+        if not 20 <= x <= 2980:
+            position[row, 0] = max(20, min(x, 2980))
     
-    def shoot(self, projectiles: List):
+    def shoot(self, projectiles: List, current_time: Optional[float] = None):
         """Shoot a projectile"""
-        current_time = pygame.time.get_ticks() / 1000.0
+        if current_time is None:
+            current_time = pygame.time.get_ticks() / 1000.0
         
         if current_time - self.last_shot_time >= self.shoot_cooldown:
             # Import here to avoid circular imports
@@ -116,20 +128,21 @@ class Player:
             
             # Create projectile
             projectile_speed = 400 if not self.has_power_up else 600
-            projectile_damage = 25 if not self.has_power_up else 40
+            projectile_damage = 25 if not self.has_power_up else self.power_up_damage
             projectile_color = YELLOW if not self.has_power_up else ORANGE
             
             projectile = Projectile(
                 self.position.x + (self.width // 2 * self.direction),
                 self.position.y - self.height // 2,
                 direction, projectile_speed, projectile_damage,
-                EntityType.PLAYER, projectile_color
+                EntityType.PLAYER, projectile_color, self.world
             )
             projectiles.append(projectile)
             self.last_shot_time = current_time
     
     def take_damage(self, damage: int):
         """Take damage and handle death"""
+        self.damage_taken += damage
         self.health -= damage
         if self.health <= 0:
             self.health = 0
@@ -137,6 +150,7 @@ class Player:
     
     def die(self):
         """Handle player death"""
+        self.deaths += 1
         self.lives -= 1
         if self.lives > 0:
             self.health = self.max_health
@@ -154,7 +168,7 @@ class Player:
     def activate_power_up(self):
         """Activate power-up"""
         self.has_power_up = True
-        self.power_up_timer = 10.0  # 10 seconds
+        self.power_up_timer = self.power_up_duration  # 10 seconds by default
     
     def draw(self, screen: pygame.Surface, camera: Camera):
         """Draw player on screen"""
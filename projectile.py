@@ -7,16 +7,27 @@ Handles projectiles fired by players and enemies.
 """
 
 import pygame
-from typing import Tuple
+from typing import Tuple, Optional
 from utils import Vector2
 from camera import Camera
 from constants import EntityType, WHITE
+from ecs import Entity, World, Field, VectorField
+from systems import move_projectile_rows
 
-class Projectile:
+class Projectile(Entity):
     """Projectile class with movement, speed, and damage"""
     
+    components = ('position', 'velocity', 'projectile', 'renderable')
+    position = VectorField('position')
+    velocity = VectorField('velocity')
+    damage = Field('projectile', 0, int)
+    _owner_type = Field('projectile', 1, int)
+    radius = Field('projectile', 2, int)
+    
     def __init__(self, x: float, y: float, direction: Vector2, speed: float, 
-                 damage: int, owner_type: EntityType, color: Tuple[int, int, int] = WHITE):
+                 damage: int, owner_type: EntityType, color: Tuple[int, int, int] = WHITE,
+                 world: Optional[World] = None):
+        super().__init__(world)
         self.position = Vector2(x, y)
         self.velocity = direction.normalize() * speed
         self.damage = damage
@@ -24,22 +35,30 @@ class Projectile:
         self.color = color
         self.radius = 3
         self.active = True
-        self.rect = pygame.Rect(x - self.radius, y - self.radius, 
-                               self.radius * 2, self.radius * 2)
+    
+    @property
+    def owner_type(self) -> EntityType:
+        return EntityType(self._owner_type)
+    
+    @owner_type.setter
+    def owner_type(self, owner_type: EntityType):
+        self._owner_type = owner_type.value
+    
+    @property
+    def rect(self) -> pygame.Rect:
+        """Bounding rectangle centred on the projectile"""
+        rect = pygame.Rect(0, 0, self.radius * 2, self.radius * 2)
+        rect.center = (int(self.position.x), int(self.position.y))
+        return rect
     
     def update(self, dt: float):
         """Update projectile position and check bounds"""
         if not self.active:
             return
         
-        # Update position
-        self.position = self.position + self.velocity * dt
-        self.rect.center = (int(self.position.x), int(self.position.y))
-        
-        # Deactivate if out of bounds
-        if (self.position.x < -50 or self.position.x > 3000 or
-            self.position.y < -50 or self.position.y > 1000):
-            self.active = False
+        # Move and deactivate if out of bounds (batched for all projectiles by systems.update_projectiles)
+        archetype, row = self.locate()
+        move_projectile_rows(archetype, slice(row, row + 1), dt)
     
     def draw(self, screen: pygame.Surface, camera: Camera):
         """Draw projectile on screen"""
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Batch Simulation Runner for Wild Defender Game
+==============================================
+
+Runs thousands of headless games across a multiprocessing pool to balance enemy
+stats and power-up values. Every run uses one parameter set from the sweep and a
+seeded scripted player, and the results stream into a single CSV (or Parquet,
+when pyarrow is installed) file while a per-parameter-set summary is printed.
+
+Example:
+    python simulate.py --param soldier.speed=60,80,100 --param power_up_duration=5,10 \\
+                       --runs 50 --output sweep.csv
+"""
+
+import os
+import csv
+import sys
+import time
+import random
+import argparse
+import itertools
+import multiprocessing
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Simulations never open a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+# Leave SIGINT/SIGTERM to Python so the pool can stop its workers
+os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+
+import pygame
+
+ENEMY_TYPES = ('soldier', 'archer', 'boss')
+ENEMY_STATS = ('max_health', 'speed', 'damage', 'shoot_cooldown', 'detection_range')
+PLAYER_PARAMS = ('power_up_duration', 'power_up_damage')
+COLLECTIBLE_PARAMS = ('health_boost',)
+
+RESULT_FIELDS = ['run', 'seed', 'completed', 'levels_cleared', 'time_to_clear',
+                 'sim_time', 'damage_taken', 'deaths', 'score']
+
+class ScriptedInput:
+    """Seeded bot that presses keys like a (rather simple) player"""
+    
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.pressed = set()
+        self.hold = 0
+    
+    def next_frame(self) -> 'ScriptedInput':
+        """Choose the keys held during the next frame"""
+        if self.hold <= 0:
+            # Mostly advance to the right, sometimes back off
+            self.pressed = {pygame.K_RIGHT} if self.random.random() < 0.8 else {pygame.K_LEFT}
+            self.hold = self.random.randint(10, 60)
+        self.hold -= 1
+        
+        self.pressed.discard(pygame.K_SPACE)
+        if self.random.random() < 0.02:
+            self.pressed.add(pygame.K_SPACE)
+        return self
+    
+    def wants_to_shoot(self) -> bool:
+        return self.random.random() < 0.3
+    
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+def build_tuning(params: Dict[str, float]) -> Dict:
+    """Convert flat 'soldier.speed' style parameters into a Game tuning dictionary"""
+    tuning = {'enemies': {}, 'player': {}, 'collectibles': {}}
+    for name, value in params.items():
+        if '.' in name:
+            enemy_type, stat = name.split('.', 1)
+            tuning['enemies'].setdefault(enemy_type, {})[stat] = value
+        elif name in PLAYER_PARAMS:
+            tuning['player'][name] = value
+        elif name == 'health_boost':
+            tuning['collectibles']['health'] = value
+    return tuning
+
+def check_tuning(game, params: Dict[str, float]):
+    """Fail loudly if a swept parameter did not reach the entities of the current level"""
+    for name, value in params.items():
+        if '.' in name:
+            enemy_type, stat = name.split('.', 1)
+            actual = [getattr(enemy, stat) for enemy in game.enemies if enemy.enemy_type == enemy_type]
+        elif name in PLAYER_PARAMS:
+            actual = [getattr(game.player, name)]
+        else:
+            actual = [collectible.value for collectible in game.collectibles if collectible.type == 'health']
+        if any(stat_value != value for stat_value in actual):
+            raise RuntimeError(f"parameter {name}={value} was not applied (found {actual})")
+
+def run_simulation(job: Tuple[int, int, Dict[str, float], float, float]) -> Dict:
+    """Play one headless game and return its metrics"""
+    run, seed, params, max_time, dt = job
+    from game import Game
+    from constants import GameState
+    
+    game = Game(headless=True, tuning=build_tuning(params))
+    game.state = GameState.PLAYING
+    check_tuning(game, params)
+    bot = ScriptedInput(seed)
+    levels_cleared = 0
+    time_to_clear = None
+    
+    while game.game_time < max_time:
+        keys = bot.next_frame()
+        if bot.wants_to_shoot():
+            game.player.shoot(game.projectiles, game.game_time)
+        game.update(dt, keys)
+        
+        if game.state == GameState.LEVEL_COMPLETE:
+            levels_cleared += 1
+            if game.current_level >= game.max_level:
+                time_to_clear = round(game.game_time, 3)
+                break
+            game.load_level(game.current_level + 1)
+            check_tuning(game, params)
+            game.state = GameState.PLAYING
+        elif game.state == GameState.GAME_OVER:
+            break
+    
+    result = {
+        'run': run,
+        'seed': seed,
+        'completed': time_to_clear is not None,
+        'levels_cleared': levels_cleared,
+        'time_to_clear': time_to_clear,
+        'sim_time': round(game.game_time, 3),
+        'damage_taken': game.player.damage_taken,
+        'deaths': game.player.deaths,
+        'score': game.score,
+    }
+    result.update(params)
+    return result
+
+def parse_sweep(specs: List[str]) -> List[Dict[str, float]]:
+    """Expand 'name=v1,v2,...' specifications into the cartesian product of parameter sets"""
+    names, values = [], []
+    for spec in specs:
+        name, _, raw = spec.partition('=')
+        if '.' in name:
+            enemy_type, stat = name.split('.', 1)
+            if enemy_type not in ENEMY_TYPES or stat not in ENEMY_STATS:
+                raise ValueError(f"unknown enemy parameter: {name}")
+        elif name not in PLAYER_PARAMS + COLLECTIBLE_PARAMS:
+            raise ValueError(f"unknown parameter: {name}")
+        names.append(name)
+        values.append([float(value) for value in raw.split(',')])
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+class ResultWriter:
+    """Streams result rows to a CSV file, or to Parquet in batches"""
+    
+    def __init__(self, path: str, fields: List[str], batch_size: int = 1000):
+        self.path = path
+        self.fields = fields
+        self.batch_size = batch_size
+        self.batch: List[Dict] = []
+        self.parquet = None
+        
+        if path.endswith('.parquet'):
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise ImportError("Parquet output requires pyarrow (pip install pyarrow); use a .csv path instead") from None
+            self.pyarrow = pyarrow
+            self.parquet = pyarrow.parquet
+            self.writer = None
+        else:
+            self.file = open(path, 'w', newline='')
+            self.writer = csv.DictWriter(self.file, fieldnames=fields)
+            self.writer.writeheader()
+    
+    def write(self, row: Dict):
+        if self.parquet is None:
+            self.writer.writerow(row)
+            return
+        
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            self._write_batch()
+    
+    def close(self):
+        if self.parquet is None:
+            self.file.close()
+            return
+        
+        if self.batch:
+            self._write_batch()
+        if self.writer is not None:
+            self.writer.close()
+    
+    def _write_batch(self):
+        table = self.pyarrow.Table.from_pylist(self.batch)
+        if self.writer is None:
+            self.writer = self.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+        self.batch.clear()
+
+def summarize(results: Dict[Tuple, List[Dict]], names: List[str]):
+    """Print aggregate metrics for every parameter set"""
+    header = names + ['runs', 'completion', 'time_to_clear', 'damage_taken', 'deaths', 'score']
+    print(' '.join(f"{name:>14}" for name in header))
+    for key, rows in sorted(results.items()):
+        cleared = [row['time_to_clear'] for row in rows if row['completed']]
+        columns = list(key) + [
+            len(rows),
+            f"{len(cleared) / len(rows):.0%}",
+            f"{sum(cleared) / len(cleared):.1f}s" if cleared else '-',
+            f"{sum(row['damage_taken'] for row in rows) / len(rows):.1f}",
+            f"{sum(row['deaths'] for row in rows) / len(rows):.2f}",
+            f"{sum(row['score'] for row in rows) / len(rows):.0f}",
+        ]
+        print(' '.join(f"{str(column):>14}" for column in columns))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Wild Defender simulations for balancing sweeps")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help="parameter to sweep, e.g. soldier.speed=60,80 or power_up_duration=5,10 "
+                             f"(enemy stats: {', '.join(ENEMY_STATS)}; "
+                             f"other: {', '.join(PLAYER_PARAMS + COLLECTIBLE_PARAMS)})")
+    parser.add_argument('--runs', type=int, default=20, help="seeded runs per parameter set (default: 20)")
+    parser.add_argument('--seed', type=int, default=0, help="first seed (default: 0)")
+    parser.add_argument('--max-time', type=float, default=300.0, help="simulated seconds per run (default: 300)")
+    parser.add_argument('--dt', type=float, default=1.0 / 60, help="simulation time step (default: 1/60)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument('--output', default='simulations.csv', help="results file, .csv or .parquet")
+    args = parser.parse_args()
+    
+    try:
+        sweep = parse_sweep(args.param)
+    except ValueError as error:
+        parser.error(str(error))
+    
+    names = [spec.partition('=')[0] for spec in args.param]
+    jobs = []
+    for params in sweep:
+        for index in range(args.runs):
+            jobs.append((len(jobs), args.seed + index, params, args.max_time, args.dt))
+    
+    try:
+        writer = ResultWriter(args.output, RESULT_FIELDS + names)
+    except ImportError as error:
+        parser.error(str(error))
+    results = defaultdict(list)
+    start = time.perf_counter()
+    
+    print(f"Running {len(jobs)} simulations on {args.workers} workers...", file=sys.stderr)
+    pool = multiprocessing.Pool(args.workers)
+    try:
+        for done, result in enumerate(pool.imap_unordered(run_simulation, jobs, chunksize=4), 1):
+            writer.write(result)
+            results[tuple(result[name] for name in names)].append(result)
+            if done % 50 == 0 or done == len(jobs):
+                elapsed = time.perf_counter() - start
+                print(f"\r  {done}/{len(jobs)} runs, {done / elapsed:.1f} runs/s", end='', file=sys.stderr)
+        # Let the workers finish and exit on their own
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        writer.close()
+    print(file=sys.stderr)
+    
+    summarize(results, names)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Game State Snapshots for Wild Defender Game
+===========================================
+
+Packs a running game into a compact binary buffer and restores it again, for
+quick-save, rewind, branching simulations and crash-repro dumps. The layout is:
+
+    header      game state, level, score, clock, camera and entity counts
+    per group   (player, enemies, projectiles, collectibles)
+        records     the plain attributes of every wrapper object, packed with struct
+        components  the entity rows of every component column as raw float64
+
+Component data is copied straight out of the ECS columns with one gather per
+component, so no pygame objects are ever pickled.
+"""
+
+import struct
+import numpy as np
+from typing import List, Tuple
+from constants import GameState
+from ecs import COMPONENTS, Entity, World
+from player import Player
+from enemy import Enemy
+from projectile import Projectile
+from collectible import Collectible
+
+MAGIC = b'WDSN'
+VERSION = 3
+
+# magic, version, state, level, score, game time, paused, camera x/y/target x/target y, group sizes
+HEADER = struct.Struct('<4sBBBqd?4d4I')
+
+class RecordFormat:
+    """Struct layout for the plain (non-component) attributes of a wrapper class"""
+    
+    # Codecs for attributes struct cannot pack directly
+    STRING = '8s'   # short identifiers such as enemy and collectible types
+    COLOR = 'I'     # (r, g, b) tuples packed as 0xRRGGBB
+    
+    def __init__(self, cls: type, fields: Tuple[Tuple[str, str], ...]):
+        self.cls = cls
+        self.fields = fields
+        self.struct = struct.Struct('<' + ''.join(code for _, code in fields))
+    
+    def pack(self, obj) -> bytes:
+        values = []
+        for name, code in self.fields:
+            value = getattr(obj, name)
+            if code == self.STRING:
+                value = value.encode()
+            elif code == self.COLOR:
+                value = value[0] << 16 | value[1] << 8 | value[2]
+            values.append(value)
+        return self.struct.pack(*values)
+    
+    def unpack(self, values: Tuple) -> dict:
+        attributes = {}
+        for (name, code), value in zip(self.fields, values):
+            if code == self.STRING:
+                value = value.rstrip(b'\0').decode()
+            elif code == self.COLOR:
+                value = (value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF)
+            attributes[name] = value
+        return attributes
+
+# Stats that balancing overrides may turn into floats are stored as doubles
+PLAYER_RECORD = RecordFormat(Player, (
+    ('max_lives', 'i'), ('lives', 'i'), ('speed', 'd'), ('jump_speed', 'd'), ('direction', 'i'),
+    ('last_shot_time', 'd'), ('shoot_cooldown', 'd'), ('power_up_timer', 'd'), ('has_power_up', '?'),
+    ('power_up_duration', 'd'), ('power_up_damage', 'd'), ('damage_taken', 'd'),
+    ('deaths', 'i'), ('is_running', '?'), ('is_jumping', '?'), ('animation_time', 'd'),
+))
+ENEMY_RECORD = RecordFormat(Enemy, (
+    ('enemy_type', '8s'), ('active', '?'), ('damage', 'd'), ('color', 'I'),
+    ('last_melee_time', 'd'), ('jump_speed', 'd'),
+))
+PROJECTILE_RECORD = RecordFormat(Projectile, (
+    ('active', '?'), ('color', 'I'),
+))
+COLLECTIBLE_RECORD = RecordFormat(Collectible, (
+    ('type', '8s'), ('active', '?'), ('value', 'd'), ('color', 'I'),
+))
+RECORDS = (PLAYER_RECORD, ENEMY_RECORD, PROJECTILE_RECORD, COLLECTIBLE_RECORD)
+
+def pack_game(game) -> bytes:
+    """Serialize the complete state of a game"""
+    groups = ([game.player], game.enemies, game.projectiles, game.collectibles)
+    camera = game.camera
+    parts = [HEADER.pack(MAGIC, VERSION, game.state.value, game.current_level, game.score,
+                         game.game_time, game.paused, camera.x, camera.y, camera.target_x,
+                         camera.target_y, *(len(group) for group in groups))]
+    
+    for record, entities in zip(RECORDS, groups):
+        parts.extend(record.pack(entity) for entity in entities)
+        if entities:
+            # Every object of a wrapper class lives in the same archetype
+            archetype = entities[0].locate()[0]
+            rows = [game.world.locations[entity.entity][1] for entity in entities]
+            parts.extend(archetype.columns[name][rows].tobytes() for name in archetype.signature)
+    return b''.join(parts)
+
+def unpack_game(game, blob: bytes):
+    """Replace the state of a game with a snapshot taken by pack_game"""
+    header = HEADER.unpack_from(blob)
+    magic, version, state, level, score, game_time, paused = header[:7]
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a Wild Defender snapshot (or an incompatible version)")
+    
+    # Drop the current entities; their ids are never reused
+    if game.boss_planner:
+        game.boss_planner.reset()
+    game.player.destroy()
+    for entities in (game.enemies, game.projectiles, game.collectibles):
+        game._clear_entities(entities)
+    
+    offset = HEADER.size
+    groups = []
+    for record, count in zip(RECORDS, header[11:]):
+        entities, offset = _unpack_group(record, game.world, blob, offset, count)
+        groups.append(entities)
+    
+    # Lists are refilled in place because callers may hold on to them
+    game.player = groups[0][0]
+    game.enemies[:] = groups[1]
+    game.projectiles[:] = groups[2]
+    game.collectibles[:] = groups[3]
+    
+    game.state = GameState(state)
+    game.current_level = level
+    
+    # The map and its flow field only depend on the level; a restore within the
+    # same level keeps them and just makes the field find the player again
+    world = game.world
+    if world.flow is not None and world.tiles is game.tile_maps.get(level):
+        world.flow.reset()
+    else:
+        game._attach_map(world, level)
+    game.score = score
+    game.game_time = game_time
+    game.paused = paused
+    game.camera.x, game.camera.y, game.camera.target_x, game.camera.target_y = header[7:11]
+
+def _unpack_group(record: RecordFormat, world: World, blob: bytes, offset: int,
+                  count: int) -> Tuple[List[Entity], int]:
+    """Recreate count wrapper objects from a snapshot; return them and the new offset"""
+    entities = []
+    size = record.struct.size
+    for values in record.struct.iter_unpack(blob[offset:offset + count * size]):
+        # Bypass the constructor: every attribute comes from the snapshot
+        entity = record.cls.__new__(record.cls)
+        Entity.__init__(entity, world)
+        entity.__dict__.update(record.unpack(values))
+        entities.append(entity)
+    offset += count * size
+    
+    if entities:
+        archetype = entities[0].locate()[0]
+        rows = [world.locations[entity.entity][1] for entity in entities]
+        for name in archetype.signature:
+            width = COMPONENTS[name]
+            archetype.columns[name][rows] = np.frombuffer(blob, np.float64, count * width, offset).reshape(count, width)
+            offset += count * width * 8
+    return entities, offset
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Startup Profiling for Wild Defender Game
+========================================
+
+Records how long each startup phase (imports, subsystem initialization, level
+load, font loading, first frame) takes so `python game.py --profile-startup`
+can print a breakdown of the time to the first menu frame.
+"""
+
+import sys
+import time
+from typing import List, Tuple
+
+class StartupProfiler:
+    """Timeline of named startup phases"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases: List[Tuple[str, float]] = []
+        self.finished = False
+    
+    def mark(self, phase: str):
+        """End the current phase under the given name; ignored once startup has finished"""
+        if self.finished:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def finish(self, phase: str):
+        """End the last startup phase"""
+        self.mark(phase)
+        self.finished = True
+    
+    def report(self, stream=sys.stderr):
+        """Print the duration of every phase and the total"""
+        print("Startup profile:", file=stream)
+        for phase, seconds in self.phases:
+            print(f"  {phase:<24} {seconds * 1000:8.1f} ms", file=stream)
+        print(f"  {'total':<24} {(self.last - self.start) * 1000:8.1f} ms", file=stream)
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Systems for Wild Defender Game
+==============================
+
+Batched game logic that runs over the dense component columns of an ECS World.
+Every system works on a whole archetype at once; the per-object update methods
+of the wrapper classes call the same code with a single row.
+"""
+
+import math
+import numpy as np
+from typing import List, Optional, Tuple
+from utils import Vector2
+from ecs import Archetype, World
+from tilemap import BATCH_MIN, TileMap
+from flowfield import FlowField
+
+# Layout of the 'ai' component
+AI_STATE = 0
+AI_SPEED = 1
+AI_DETECTION_RANGE = 2
+AI_SHOOT_COOLDOWN = 3
+AI_LAST_SHOT_TIME = 4
+AI_PATROL_START_X = 5
+AI_PATROL_RANGE = 6
+AI_DIRECTION = 7
+AI_DECIDED_AT = 8  # game time of the last decision, for scheduling latency
+
+# AI states
+AI_PATROL = 0
+AI_CHASE = 1
+AI_ATTACK = 2
+AI_STATE_NAMES = ('patrol', 'chase', 'attack')
+
+# Below this many box pairs a plain loop beats building the pairwise overlap matrix
+PAIR_BATCH_MIN = 128
+
+# World limits
+GROUND_Y = 600
+ATTACK_RANGE = 100
+
+def live_rows(archetype: Archetype) -> slice:
+    """Row selector covering every live entity of an archetype"""
+    return slice(0, archetype.count)
+
+def apply_physics(archetype: Archetype, rows: slice, dt: float, tiles: Optional[TileMap] = None):
+    """Apply gravity, integrate velocity and collide with the tile map (or a flat ground)"""
+    if tiles is not None and rows.stop - rows.start < BATCH_MIN:
+        _apply_physics_each(archetype, rows, dt, tiles)
+        return
+    
+    # Slices give views, so the updates below write straight into the columns
+    position = archetype.columns['position'][rows]
+    velocity = archetype.columns['velocity'][rows]
+    physics = archetype.columns['physics'][rows]
+    
+    # Apply gravity to airborne entities
+    velocity[:, 1] += physics[:, 0] * dt * (physics[:, 1] == 0)
+    
+    # Move one axis at a time against the tiles the boxes overlap
+    if tiles is not None:
+        physics[:, 1] = tiles.resolve(position, velocity, archetype.columns['collider'][rows], dt)
+        return
+    
+    # Update position
+    position += velocity * dt
+    
+    # Without a map the ground is flat (at y = 600)
+    grounded = position[:, 1] >= GROUND_Y
+    position[grounded, 1] = GROUND_Y
+    velocity[grounded, 1] = 0.0
+    physics[:, 1] = grounded
+
+def _apply_physics_each(archetype: Archetype, rows: slice, dt: float, tiles: TileMap):
+    """apply_physics() on the tile map one entity at a time, reading and writing each column once"""
+    columns = archetype.columns
+    velocity = columns['velocity'][rows]
+    physics = columns['physics'][rows]
+    velocities = velocity.tolist()
+    falling = False
+    for motion, (gravity, on_ground) in zip(velocities, physics.tolist()):
+        if not on_ground:
+            motion[1] += gravity * dt
+            falling = True
+    
+    position = columns['position'][rows]
+    positions = position.tolist()
+    grounded, stopped = tiles.move(positions, velocities, columns['collider'][rows].tolist(), dt)
+    position[:] = positions
+    if falling or stopped:
+        velocity[:] = velocities
+    physics[:, 1] = grounded
+
+def update_enemy_rows(archetype: Archetype, rows: slice, dt: float, player_pos: Vector2,
+                      projectiles: List, current_time: float, tiles: Optional[TileMap] = None,
+                      flow: Optional[FlowField] = None):
+    """Run the patrol/chase/attack state machine and physics for enemy rows"""
+    decide_enemy_rows(archetype, rows, player_pos, projectiles, current_time, flow)
+    apply_physics(archetype, rows, dt, tiles)
+
+def decide_enemy_rows(archetype: Archetype, rows: slice, player_pos: Vector2, projectiles: List,
+                      current_time: float, flow: Optional[FlowField] = None):
+    """Re-evaluate the AI state, steering and shooting of enemy rows"""
+    if rows.stop - rows.start < BATCH_MIN:
+        _decide_each(archetype, rows, player_pos, projectiles, current_time, flow)
+        return
+    
+    position = archetype.columns['position']
+    velocity = archetype.columns['velocity']
+    ai = archetype.columns['ai']
+    
+    # Calculate distance to player
+    x = position[rows, 0]
+    dx = player_pos.x - x
+    dy = player_pos.y - position[rows, 1]
+    distance = np.hypot(dx, dy)
+    
+    # AI State Machine
+    state = np.where(distance <= ai[rows, AI_DETECTION_RANGE],
+                     np.where(distance <= ATTACK_RANGE, AI_ATTACK, AI_CHASE), AI_PATROL)
+    ai[rows, AI_STATE] = state
+    patrol = state == AI_PATROL
+    chase = state == AI_CHASE
+    speed = ai[rows, AI_SPEED]
+    direction = ai[rows, AI_DIRECTION]
+    
+    # Patrol behavior - move back and forth, slower than chasing
+    start = ai[rows, AI_PATROL_START_X]
+    patrol_range = ai[rows, AI_PATROL_RANGE]
+    patrol_direction = np.where(x <= start - patrol_range, 1.0,
+                                np.where(x >= start + patrol_range, -1.0, direction))
+    
+    # Chase behavior - follow the flow field toward the player (straight at the player
+    # within the player's cell), as fast as the x component of the direction to the player
+    chase_x = np.divide(dx, distance, out=np.zeros_like(dx), where=distance > 0)
+    chase_direction = np.where(chase_x > 0, 1.0, -1.0)
+    if flow is not None:
+        flow_direction, flow_jump = flow.steer(x, position[rows, 1])
+        chase_direction = np.where(flow_direction != 0, flow_direction, chase_direction)
+    
+    # Attack behavior - stop moving and shoot when the cooldown has passed
+    ai[rows, AI_DIRECTION] = np.where(patrol, patrol_direction, np.where(chase, chase_direction, direction))
+    velocity[rows, 0] = np.where(patrol, speed * patrol_direction * 0.5,
+                                 np.where(chase, chase_direction * np.abs(chase_x) * speed, 0.0))
+    
+    # Chasers jump onto blocks and platforms where the field says so
+    if flow is not None:
+        jumping = chase & flow_jump & (archetype.columns['physics'][rows, 1] != 0)
+        if jumping.any():
+            for row in np.arange(archetype.count)[rows][jumping]:
+                velocity[row, 1] = archetype.owners[row].jump_speed
+    
+    ready = (state == AI_ATTACK) & (current_time - ai[rows, AI_LAST_SHOT_TIME] >= ai[rows, AI_SHOOT_COOLDOWN])
+    if ready.any():
+        for row in np.arange(archetype.count)[rows][ready]:
+            archetype.owners[row].shoot_at(player_pos, projectiles, current_time)
+    ai[rows, AI_DECIDED_AT] = current_time
+
+def _decide_each(archetype: Archetype, rows: slice, player_pos: Vector2, projectiles: List,
+                 current_time: float, flow: Optional[FlowField] = None):
+    """decide_enemy_rows() one enemy at a time on plain floats"""
+    position = archetype.columns['position'][rows]
+    ai = archetype.columns['ai'][rows]
+    px, py = player_pos.x, player_pos.y
+    
+    # Same rounding as the batch path, so both make the same decisions
+    distances = np.hypot(px - position[:, 0], py - position[:, 1]).tolist()
+    
+    table = ai.tolist()
+    speeds, jumping, ready = [], [], []
+    for index, ((x, y), values, distance) in enumerate(zip(position.tolist(), table, distances)):
+        direction = values[AI_DIRECTION]
+        speed = values[AI_SPEED]
+        if distance > values[AI_DETECTION_RANGE]:
+            # Patrol behavior - move back and forth, slower than chasing
+            state = AI_PATROL
+            start, patrol_range = values[AI_PATROL_START_X], values[AI_PATROL_RANGE]
+            if x <= start - patrol_range:
+                direction = 1.0
+            elif x >= start + patrol_range:
+                direction = -1.0
+            speed = speed * direction * 0.5
+        elif distance > ATTACK_RANGE:
+            # Chase behavior - follow the flow field toward the player
+            state = AI_CHASE
+            chase_x = (px - x) / distance if distance > 0 else 0.0
+            direction = 1.0 if chase_x > 0 else -1.0
+            if flow is not None:
+                flow_direction, flow_jump = flow.steer_at(x, y)
+                if flow_direction:
+                    direction = float(flow_direction)
+                if flow_jump:
+                    jumping.append(index)
+            speed = direction * abs(chase_x) * speed
+        else:
+            # Attack behavior - stop moving and shoot when the cooldown has passed
+            state = AI_ATTACK
+            speed = 0.0
+            if current_time - values[AI_LAST_SHOT_TIME] >= values[AI_SHOOT_COOLDOWN]:
+                ready.append(index)
+        values[AI_STATE] = state
+        values[AI_DIRECTION] = direction
+        values[AI_DECIDED_AT] = current_time
+        speeds.append(speed)
+    
+    ai[:] = table
+    velocity = archetype.columns['velocity'][rows]
+    velocity[:, 0] = speeds
+    for index in jumping:
+        if archetype.columns['physics'][rows.start + index, 1]:
+            velocity[index, 1] = archetype.owners[rows.start + index].jump_speed
+    for index in ready:
+        archetype.owners[rows.start + index].shoot_at(player_pos, projectiles, current_time)
+
+def update_enemies(world: World, dt: float, player_pos: Vector2, projectiles: List, current_time: float):
+    """Update every enemy in the world"""
+    if world.flow is not None:
+        world.flow.update(player_pos.x, player_pos.y)
+    for archetype in world.query('ai'):
+        update_enemy_rows(archetype, live_rows(archetype), dt, player_pos, projectiles, current_time,
+                          world.tiles, world.flow)
+
+def move_projectile_rows(archetype: Archetype, rows: slice, dt: float):
+    """Move projectiles and deactivate the ones that left the world"""
+    position = archetype.columns['position']
+    if rows.stop - rows.start < BATCH_MIN:
+        moved = [(x + vx * dt, y + vy * dt)
+                 for (x, y), (vx, vy) in zip(position[rows].tolist(), archetype.columns['velocity'][rows].tolist())]
+        position[rows] = moved
+        for index, (x, y) in enumerate(moved):
+            if x < -50 or x > 3000 or y < -50 or y > 1000:
+                archetype.owners[rows.start + index].active = False
+        return
+    position[rows] += archetype.columns['velocity'][rows] * dt
+    
+    x = position[rows, 0]
+    y = position[rows, 1]
+    outside = (x < -50) | (x > 3000) | (y < -50) | (y > 1000)
+    if outside.any():
+        for row in np.arange(archetype.count)[rows][outside]:
+            archetype.owners[row].active = False
+
+def update_projectiles(world: World, dt: float):
+    """Update every projectile in the world"""
+    for archetype in world.query('projectile'):
+        move_projectile_rows(archetype, live_rows(archetype), dt)
+
+def animate_collectible_rows(archetype: Archetype, rows: slice, dt: float):
+    """Advance the floating animation of collectibles"""
+    animation = archetype.columns['animation']
+    animation[rows, 0] += animation[rows, 1] * dt
+
+def update_collectibles(world: World, dt: float):
+    """Update every collectible in the world"""
+    for archetype in world.query('animation'):
+        animate_collectible_rows(archetype, live_rows(archetype), dt)
+
+# Boxes are four arrays of sides (left, top, right, bottom) from BATCH_MIN
+# entities on, and a list of (left, top, right, bottom) tuples below that
+
+def character_boxes(archetype: Archetype):
+    """Bounding boxes of entities standing on their position"""
+    position = archetype.view('position')
+    collider = archetype.view('collider')
+    if archetype.count < BATCH_MIN:
+        boxes = []
+        for (x, y), (width, height) in zip(position.tolist(), collider.tolist()):
+            left, bottom = math.trunc(x) - width // 2, math.trunc(y)
+            boxes.append((left, bottom - height, left + width, bottom))
+        return boxes
+    left = np.trunc(position[:, 0]) - collider[:, 0] // 2
+    bottom = np.trunc(position[:, 1])
+    return left, bottom - collider[:, 1], left + collider[:, 0], bottom
+
+def projectile_boxes(archetype: Archetype):
+    """Bounding boxes of projectiles"""
+    if archetype.count < BATCH_MIN:
+        boxes = []
+        for (x, y), (_, _, radius) in zip(archetype.view('position').tolist(), archetype.view('projectile').tolist()):
+            x, y = math.trunc(x), math.trunc(y)
+            boxes.append((x - radius, y - radius, x + radius, y + radius))
+        return boxes
+    center = np.trunc(archetype.view('position'))
+    radius = archetype.view('projectile')[:, 2]
+    return center[:, 0] - radius, center[:, 1] - radius, center[:, 0] + radius, center[:, 1] + radius
+
+def collectible_boxes(archetype: Archetype):
+    """Bounding boxes of floating collectibles"""
+    position = archetype.view('position')
+    collider = archetype.view('collider')
+    if archetype.count < BATCH_MIN:
+        boxes = []
+        for (x, y), (width, height), (bob, _) in zip(position.tolist(), collider.tolist(),
+                                                     archetype.view('animation').tolist()):
+            left, top = math.trunc(x) - width // 2, math.trunc(y + math.sin(bob) * 3) - height // 2
+            boxes.append((left, top, left + width, top + height))
+        return boxes
+    bob = np.sin(archetype.view('animation')[:, 0]) * 3
+    left = np.trunc(position[:, 0]) - collider[:, 0] // 2
+    top = np.trunc(position[:, 1] + bob) - collider[:, 1] // 2
+    return left, top, left + collider[:, 0], top + collider[:, 1]
+
+def box_count(boxes) -> int:
+    """Number of boxes"""
+    return len(boxes) if isinstance(boxes, list) else len(boxes[0])
+
+def select_boxes(boxes, rows: List[int]):
+    """Subset of boxes by row"""
+    if isinstance(boxes, list):
+        return [boxes[row] for row in rows]
+    return tuple(side[rows] for side in boxes)
+
+def _box_tuples(boxes) -> List[Tuple[float, float, float, float]]:
+    """Boxes as (left, top, right, bottom) tuples"""
+    return boxes if isinstance(boxes, list) else list(zip(*(side.tolist() for side in boxes)))
+
+def _box_sides(boxes) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Boxes as left, top, right and bottom arrays"""
+    return tuple(np.array(boxes, dtype=float).reshape(-1, 4).T) if isinstance(boxes, list) else boxes
+
+def overlap_matrix(boxes_a, boxes_b) -> np.ndarray:
+    """Pairwise rectangle overlap between two sets of boxes"""
+    left_a, top_a, right_a, bottom_a = _box_sides(boxes_a)
+    left_b, top_b, right_b, bottom_b = _box_sides(boxes_b)
+    return ((left_a[:, None] < right_b[None, :]) & (right_a[:, None] > left_b[None, :]) &
+            (top_a[:, None] < bottom_b[None, :]) & (bottom_a[:, None] > top_b[None, :]))
+
+def overlaps_rect(boxes, rect) -> np.ndarray:
+    """Overlap of every box with a single pygame.Rect"""
+    left, top, right, bottom = _box_sides(boxes)
+    return (left < rect.right) & (right > rect.left) & (top < rect.bottom) & (bottom > rect.top)
+
+def overlapping_rows(boxes, rect) -> List[int]:
+    """Rows of the boxes that overlap a single pygame.Rect"""
+    if not isinstance(boxes, list):
+        return overlaps_rect(boxes, rect).nonzero()[0].tolist()
+    left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+    return [row for row, (box_left, box_top, box_right, box_bottom) in enumerate(boxes)
+            if box_left < right and box_right > left and box_top < bottom and box_bottom > top]
+
+def overlapping_pairs(boxes_a, boxes_b) -> List[Tuple[int, List[int]]]:
+    """Every row of boxes_a that overlaps some of boxes_b, with the rows of boxes_b it overlaps"""
+    if box_count(boxes_a) * box_count(boxes_b) >= PAIR_BATCH_MIN:
+        hits = overlap_matrix(boxes_a, boxes_b)
+        return [(row, hits[row].nonzero()[0].tolist()) for row in hits.any(axis=1).nonzero()[0].tolist()]
+    others = _box_tuples(boxes_b)
+    if not others:
+        return []
+    
+    # Most boxes are nowhere near any of the others, so test against their bounds first
+    lefts, tops, rights, bottoms = zip(*others)
+    bounds_left, bounds_top, bounds_right, bounds_bottom = min(lefts), min(tops), max(rights), max(bottoms)
+    pairs = []
+    for row, (left, top, right, bottom) in enumerate(_box_tuples(boxes_a)):
+        if left >= bounds_right or right <= bounds_left or top >= bounds_bottom or bottom <= bounds_top:
+            continue
+        columns = [column for column, (other_left, other_top, other_right, other_bottom) in enumerate(others)
+                   if left < other_right and right > other_left and top < other_bottom and bottom > other_top]
+        if columns:
+            pairs.append((row, columns))
+    return pairs
@@ -1,9 +1,507 @@
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk
-from PIL import Image, ImageTk
+from PIL import Image, ImageTk, TiffImagePlugin
 import cv2
 import numpy as np
+import threading
+import argparse
+import json
+import math
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+PREVIEW_SIZE = 400
+RESIZE_DEBOUNCE_MS = 40
+RESIZE_POLL_MS = 15
+ZOOM_STEP = 1.25
+MAX_ZOOM = 8.0
+PYRAMID_BUDGET_BYTES = 256 * 1024 * 1024
+TILED_PIXELS = 100_000_000
+STREAM_BYTES = 64 * 1024 * 1024
+DECODE_POLL_MS = 50
+EXPORT_POLL_MS = 100
+HISTORY_BUDGET_BYTES = 64 * 1024 * 1024
+HISTORY_COALESCE_S = 1.0
+GRAPH_NODES = 32
+RESAMPLE_SPAN = 16384
+ADJUSTMENTS = (
+    ("brightness", "Brightness", -100, 100, 0.0),
+    ("contrast", "Contrast %", 50, 200, 100.0),
+    ("blur", "Blur", 0, 10, 0.0),
+    ("sharpen", "Sharpen %", 0, 300, 0.0),
+)
+ADJUSTMENT_NAMES = tuple(adjustment[0] for adjustment in ADJUSTMENTS)
+DEFAULT_ADJUSTMENTS = tuple(adjustment[4] for adjustment in ADJUSTMENTS)
+EXPORT_FORMATS = ("png", "jpg", "bmp")
+EXPORT_PRESETS = (
+    ("", 100, "png", 95, 3),
+    ("_web", 50, "jpg", 85, 3),
+    ("_thumb", 10, "jpg", 80, 3),
+)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+BATCH_MANIFEST = ".batch-manifest.json"
+REDUCED_READ_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def image_size(file_path):
+    try:
+        with Image.open(file_path) as header:
+            return header.size
+    except Image.DecompressionBombError:
+        # Past Pillow's limit only the tiled path can open the file, and that takes a TIFF
+        try:
+            with TiffImagePlugin.TiffImageFile(file_path) as header:
+                return header.size
+        except (OSError, SyntaxError, ValueError):
+            return None
+    except (OSError, ValueError):
+        return None
+
+
+def read_preview(file_path):
+    size = image_size(file_path)
+    longest = max(size) if size else 0
+    
+    for factor, flag in REDUCED_READ_FLAGS:
+        if longest // factor >= PREVIEW_SIZE:
+            return cv2.imread(file_path, flag)
+    return cv2.imread(file_path)
+
+
+def new_array(shape):
+    if math.prod(shape) <= STREAM_BYTES:
+        return np.empty(shape, dtype=np.uint8)
+    return np.memmap(tempfile.TemporaryFile(), dtype=np.uint8, mode="w+", shape=shape)
+
+
+def too_large(file_path, size=None):
+    dimensions = f" ({size[0]}x{size[1]})" if size else ""
+    return ValueError(f"{os.path.basename(file_path)} is too large{dimensions} to decode in memory.\n"
+                      "Images this large can only be opened as uncompressed RGB TIFF files.")
+
+
+def open_tiled(file_path):
+    # The TIFF plugin is opened directly to read the header past Pillow's decompression-bomb
+    # limit; nothing is decoded by Pillow, the raw strips are mapped from the file below
+    try:
+        with TiffImagePlugin.TiffImageFile(file_path) as source:
+            width, height = source.size
+            tiles = source.tile
+            raw = source.mode == "RGB" and all(
+                tile[0] == "raw" and tile[1][0] == 0 and tile[1][2] == width
+                and tuple(tile[3][:3]) in (("RGB", 0, 1), ("RGB", width * 3, 1))
+                for tile in tiles
+            )
+    except SyntaxError:
+        raise too_large(file_path) from None
+    # Compressed files can only be decoded as a whole, which would not fit in memory
+    if not raw:
+        raise too_large(file_path, (width, height))
+
+    store = np.memmap(tempfile.TemporaryFile(), dtype=np.uint8, mode="w+", shape=(height, width, 3))
+    rows = max(1, STREAM_BYTES // (width * 3))
+    for tile in tiles:
+        top, bottom, offset = tile[1][1], tile[1][3], tile[2]
+        strip = np.memmap(file_path, dtype=np.uint8, mode="r", offset=offset, shape=(bottom - top, width, 3))
+        for y in range(0, bottom - top, rows):
+            store[top + y:top + y + rows] = strip[y:y + rows, :, ::-1]
+    store.flush()
+    return store
+
+
+def resize_area(image, width, height):
+    if image.nbytes <= STREAM_BYTES:
+        return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    
+    source_height, source_width = image.shape[:2]
+    pixel_bytes = image[0, 0].nbytes
+    widened = new_array((source_height, width) + image.shape[2:])
+    rows = max(1, STREAM_BYTES // (source_width * pixel_bytes))
+    for top in range(0, source_height, rows):
+        band = np.asarray(image[top:top + rows])
+        widened[top:top + rows] = cv2.resize(band, (width, band.shape[0]), interpolation=cv2.INTER_AREA)
+
+    resized = new_array((height, width) + image.shape[2:])
+    columns = max(1, STREAM_BYTES // (max(source_height, height) * pixel_bytes))
+    for left in range(0, width, columns):
+        strip = np.asarray(widened[:, left:left + columns])
+        resized[:, left:left + columns] = cv2.resize(strip, (strip.shape[1], height), interpolation=cv2.INTER_AREA)
+    return resized
+
+
+# Resampling for edit previews and exports: every output pixel is computed from its absolute
+# position alone, so any region of a resized image equals the same region of the whole.
+def area_taps(source_size, size, start, end):
+    # cv2.INTER_AREA when shrinking: each output pixel averages the source interval it covers
+    scale = source_size / size
+    x = np.arange(start, end, dtype=np.float64)
+    left = x * scale
+    right = np.minimum(left + scale, source_size)
+    index = np.floor(left).astype(np.intp)[:, None] + np.arange(math.ceil(scale) + 1)
+    weights = np.clip(np.minimum(index + 1, right[:, None]) - np.maximum(index, left[:, None]), 0, None)
+    weights /= (right - left)[:, None]
+    return np.minimum(index, source_size - 1), weights.astype(np.float32)
+
+
+def linear_taps(source_size, size, start, end):
+    # cv2.INTER_AREA when enlarging: linear interpolation, as source positions in 1/32 pixel steps
+    scale = source_size / size
+    x = np.arange(start, end, dtype=np.float64)
+    first = np.floor(x * scale)
+    fraction = (x + 1) - (first + 1) / scale
+    fraction = np.where(fraction <= 0, 0, fraction - np.floor(fraction))
+    steps = np.rint((first + fraction) * cv2.INTER_TAB_SIZE).astype(np.int64)
+    return np.minimum(steps, (source_size - 1) * cv2.INTER_TAB_SIZE)
+
+
+def weighted_rows(image, index, weights):
+    shape = (-1,) + (1,) * (image.ndim - 1)
+    result = np.empty((index.shape[0],) + image.shape[1:], dtype=np.float32)
+    term = np.empty_like(result)
+    np.multiply(image[index[:, 0]], weights[:, 0].reshape(shape), out=result)
+    for tap in range(1, index.shape[1]):
+        np.multiply(image[index[:, tap]], weights[:, tap].reshape(shape), out=term)
+        result += term
+    return result
+
+
+def adjust_brightness_contrast(image, brightness, contrast):
+    gain = contrast / 100
+    return cv2.addWeighted(image, gain, image, 0, 128 * (1 - gain) + brightness)
+
+
+def gaussian_blur(image, sigma):
+    return cv2.GaussianBlur(image, (0, 0), sigma)
+
+
+def unsharp_mask(image, sigma, amount):
+    blurred = cv2.GaussianBlur(image, (0, 0), sigma)
+    return cv2.addWeighted(image, 1 + amount, blurred, -amount, 0)
+
+
+def edit_size(shape, scale_percent, rotation):
+    height, width = shape[:2]
+    width, height = max(1, int(width * scale_percent / 100)), max(1, int(height * scale_percent / 100))
+    return (height, width) if rotation % 2 else (width, height)
+
+
+class Node:
+    def __init__(self, source, size):
+        self.source = source
+        self.size = size
+        self.cache_box = None
+        self.cache = None
+
+    def evaluate(self, box):
+        if box != self.cache_box:
+            self.cache = self.compute(box)
+            self.cache_box = box
+        return self.cache
+
+
+class SourceNode(Node):
+    def __init__(self, image):
+        super().__init__(None, (image.shape[1], image.shape[0]))
+        self.image = image
+
+    def compute(self, box):
+        x1, y1, x2, y2 = box
+        return self.image[y1:y2, x1:x2]
+
+
+class ResizeNode(Node):
+    def __init__(self, source, width, height):
+        super().__init__(source, (width, height))
+
+    def compute(self, box):
+        x1, y1, x2, y2 = box
+        source_width = self.source.size[0]
+        width = self.size[0]
+        columns = max(1, RESAMPLE_SPAN * width // source_width)
+        span = min(x2 - x1, columns) * source_width // width + 2
+        rows = max(1, STREAM_BYTES // (span * 3 * 4))
+        if x2 - x1 <= columns and y2 - y1 <= rows:
+            return self.resample(box)
+        
+        # Pieces of a large box join seamlessly because resampling does not depend on the box
+        result = new_array((y2 - y1, x2 - x1, 3))
+        for top in range(y1, y2, rows):
+            for left in range(x1, x2, columns):
+                bottom, right = min(top + rows, y2), min(left + columns, x2)
+                result[top - y1:bottom - y1, left - x1:right - x1] = self.resample((left, top, right, bottom))
+        return result
+
+    def resample(self, box):
+        x1, y1, x2, y2 = box
+        source_width, source_height = self.source.size
+        width, height = self.size
+        if width <= source_width and height <= source_height:
+            index_x, weights_x = area_taps(source_width, width, x1, x2)
+            index_y, weights_y = area_taps(source_height, height, y1, y2)
+            sx1, sy1 = index_x[0, 0], index_y[0, 0]
+            region = self.source.evaluate((sx1, sy1, index_x[-1, -1] + 1, index_y[-1, -1] + 1))
+            columns = np.ascontiguousarray(weighted_rows(region, index_y - sy1, weights_y).swapaxes(0, 1))
+            resized = weighted_rows(columns, index_x - sx1, weights_x)
+            return np.ascontiguousarray(np.rint(resized, out=resized).astype(np.uint8).swapaxes(0, 1))
+        
+        steps_x = linear_taps(source_width, width, x1, x2)
+        steps_y = linear_taps(source_height, height, y1, y2)
+        bits = int(math.log2(cv2.INTER_TAB_SIZE))
+        sx1, sy1 = steps_x[0] >> bits, steps_y[0] >> bits
+        region = self.source.evaluate((sx1, sy1, min(source_width, (steps_x[-1] >> bits) + 2),
+                                       min(source_height, (steps_y[-1] >> bits) + 2)))
+        positions = np.empty((y2 - y1, x2 - x1, 2), dtype=np.int16)
+        positions[..., 0] = (steps_x >> bits) - sx1
+        positions[..., 1] = ((steps_y >> bits) - sy1)[:, None]
+        fractions = ((steps_y & (cv2.INTER_TAB_SIZE - 1))[:, None] * cv2.INTER_TAB_SIZE
+                     + (steps_x & (cv2.INTER_TAB_SIZE - 1))).astype(np.uint16)
+        return cv2.remap(np.asarray(region), positions, fractions, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+class RotateNode(Node):
+    def __init__(self, source, turns):
+        width, height = source.size
+        super().__init__(source, (height, width) if turns % 2 else (width, height))
+        self.turns = turns
+
+    def compute(self, box):
+        x1, y1, x2, y2 = box
+        width, height = self.source.size
+        if self.turns == 1:
+            source_box = (width - y2, x1, width - y1, x2)
+        elif self.turns == 2:
+            source_box = (width - x2, height - y2, width - x1, height - y1)
+        else:
+            source_box = (y1, height - x2, y2, height - x1)
+        return np.ascontiguousarray(np.rot90(self.source.evaluate(source_box), self.turns))
+
+
+class FilterNode(Node):
+    def __init__(self, source, margin, function, *args):
+        super().__init__(source, source.size)
+        self.margin = margin
+        self.function = function
+        self.args = args
+
+    def compute(self, box):
+        x1, y1, x2, y2 = box
+        width, height = self.size
+        ex1, ey1 = max(x1 - self.margin, 0), max(y1 - self.margin, 0)
+        ex2, ey2 = min(x2 + self.margin, width), min(y2 + self.margin, height)
+        region = np.ascontiguousarray(self.source.evaluate((ex1, ey1, ex2, ey2)))
+        return self.function(region, *self.args)[y1 - ey1:y2 - ey1, x1 - ex1:x2 - ex1]
+
+
+class EditGraph:
+    def __init__(self):
+        self.nodes = OrderedDict()
+
+    def node(self, key, factory, *args):
+        if key in self.nodes:
+            self.nodes.move_to_end(key)
+            return self.nodes[key]
+        
+        node = factory(*args)
+        self.nodes[key] = node
+        while len(self.nodes) > GRAPH_NODES:
+            self.nodes.popitem(last=False)
+        return node
+
+    def build(self, image, scale_percent, rotation, adjustments):
+        key = (id(image), image.shape)
+        node = self.node(key, SourceNode, image)
+        height, width = image.shape[:2]
+        new_width, new_height = edit_size(image.shape, scale_percent, 0)
+        if (new_width, new_height) != (width, height):
+            key += ("resize", new_width, new_height)
+            node = self.node(key, ResizeNode, node, new_width, new_height)
+        if rotation:
+            key += ("rotate", rotation)
+            node = self.node(key, RotateNode, node, rotation)
+
+        
+        brightness, contrast, blur, sharpen = adjustments
+        scale = scale_percent / 100
+        if brightness or contrast != 100:
+            key += ("levels", brightness, contrast)
+            node = self.node(key, FilterNode, node, 0, adjust_brightness_contrast, brightness, contrast)
+        if blur * scale >= 0.1:
+            key += ("blur", blur * scale)
+            node = self.node(key, FilterNode, node, math.ceil(3 * blur * scale) + 1, gaussian_blur, blur * scale)
+        if sharpen and scale >= 0.1:
+            key += ("sharpen", sharpen, scale)
+            node = self.node(key, FilterNode, node, math.ceil(3 * scale) + 1, unsharp_mask, scale, sharpen / 100)
+        return node
+
+
+def render_edit(image, scale_percent, rotation, adjustments):
+    node = EditGraph().build(image, scale_percent, rotation, adjustments)
+    if isinstance(node, SourceNode):
+        return image
+
+    width, height = node.size
+    result = new_array((height, width, 3))
+    rows = max(1, STREAM_BYTES // (width * 3 * 4))
+    for top in range(0, height, rows):
+        bottom = min(top + rows, height)
+        result[top:bottom] = node.evaluate((0, top, width, bottom))
+    return result
+
+
+def export_image(image, file_path, scale_percent, quality, compression, rotation=0, adjustments=DEFAULT_ADJUSTMENTS):
+    params = []
+    if file_path.endswith(".jpg"):
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    elif file_path.endswith(".png"):
+        params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+    resized = render_edit(image, scale_percent, rotation, adjustments)
+    if not cv2.imwrite(file_path, resized, params):
+        raise OSError(f"could not write {file_path}")
+    return file_path
+
+
+class ImagePyramid:
+    def __init__(self, image, budget_bytes=PYRAMID_BUDGET_BYTES):
+        self.base = image
+        self.budget_bytes = budget_bytes
+        self.levels = OrderedDict()
+        self.cached_bytes = 0
+
+    def level_for(self, scale):
+        level = 0
+        while scale <= 0.5 and min(self.base.shape[:2]) >> (level + 1) > 0:
+            scale *= 2
+            level += 1
+        return self.level(level)
+
+    def level(self, level):
+        if level == 0:
+            return self.base
+        if level in self.levels:
+            self.levels.move_to_end(level)
+            return self.levels[level]
+        
+        above = self.level(level - 1)
+        if above.nbytes <= STREAM_BYTES:
+            image = cv2.pyrDown(above)
+        else:
+            image = resize_area(above, (above.shape[1] + 1) // 2, (above.shape[0] + 1) // 2)
+        self.levels[level] = image
+        self.cached_bytes += image.nbytes
+        while self.cached_bytes > self.budget_bytes and len(self.levels) > 1:
+            _, evicted = self.levels.popitem(last=False)
+            self.cached_bytes -= evicted.nbytes
+        return image
+
+
+class EditHistory:
+    def __init__(self, budget_bytes=HISTORY_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.operations = []
+        self.position = 0
+        self.pushed_at = 0.0
+        self.results = OrderedDict()
+        self.cached_bytes = 0
+
+    def state(self):
+        box, scale, rotation = None, 100.0, 0
+        adjustments = list(DEFAULT_ADJUSTMENTS)
+        for operation, value in self.operations[:self.position]:
+            if operation == "crop":
+                box, scale = value, 100.0
+            elif operation == "resize":
+                scale = value
+            elif operation == "rotate":
+                rotation = value
+            elif operation == "adjust":
+                adjustments[ADJUSTMENT_NAMES.index(value[0])] = value[1]
+        return box, scale, rotation, tuple(adjustments)
+
+    def push(self, operation, value):
+        del self.operations[self.position:]
+        now = time.monotonic()
+        if self.operations and now - self.pushed_at < HISTORY_COALESCE_S and (
+                (operation == "resize" and self.operations[-1][0] == "resize")
+                or (operation == "adjust" and self.operations[-1][0] == "adjust"
+                    and self.operations[-1][1][0] == value[0])):
+            self.operations[-1] = (operation, value)
+        else:
+            self.operations.append((operation, value))
+        self.position = len(self.operations)
+        self.pushed_at = now
+
+    def undo(self):
+        if self.position == 0:
+            return False
+        self.position -= 1
+        self.pushed_at = 0.0
+        return True
+
+    def redo(self):
+        if self.position == len(self.operations):
+            return False
+        self.position += 1
+        self.pushed_at = 0.0
+        return True
+
+    def cached(self, key):
+        if key not in self.results:
+            return None
+        self.results.move_to_end(key)
+        return self.results[key]
+
+    def store(self, key, image):
+        if key in self.results:
+            self.cached_bytes -= self.results.pop(key).nbytes
+        self.results[key] = image
+        self.cached_bytes += image.nbytes
+        while self.cached_bytes > self.budget_bytes and len(self.results) > 1:
+            _, evicted = self.results.popitem(last=False)
+            self.cached_bytes -= evicted.nbytes
+
+    def clear(self):
+        self.operations.clear()
+        self.position = 0
+        self.results.clear()
+        self.cached_bytes = 0
+
+
+class CanvasImage:
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.buffer = None
+        self.photo = None
+        self.item = None
+
+    def show(self, image, width, height, interpolation=cv2.INTER_AREA):
+        if image.shape[:2] != (height, width):
+            if image.nbytes > STREAM_BYTES:
+                image = resize_area(image, width, height)
+            else:
+                if self.buffer is None or self.buffer.shape[:2] != (height, width):
+                    self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+                image = cv2.resize(image, (width, height), dst=self.buffer, interpolation=interpolation)
+        frame = Image.frombuffer("RGB", (width, height), np.ascontiguousarray(image), "raw", "BGR", 0, 1)
+
+        if self.photo is not None and (self.photo.width(), self.photo.height()) == (width, height):
+            self.photo.paste(frame)
+        else:
+            self.photo = ImageTk.PhotoImage(frame)
+            self.canvas.config(width=width, height=height)
+            if self.item is not None:
+                self.canvas.itemconfig(self.item, image=self.photo)
+        if self.item is None:
+            self.item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.item = None
+
 
 class ImageEditorApp:
     def __init__(self, root):
@@ -12,10 +510,30 @@ class ImageEditorApp:
         
         
         self.original_image = None      
-        self.display_image = None       
+        self.display_size = None       
         self.cropped_image = None       
-        self.tk_original_image = None   
-        self.tk_cropped_image = None    
+        self.original_view = None   
+        self.cropped_view = None    
+        self.full_image_future = None
+        self.full_image_action = None
+        self.full_image_poll_id = None
+        self.tiled_preview = None
+        self.pyramid = None
+        self.view_scale = None
+        self.view_x = 0.0
+        self.view_y = 0.0
+        self.pan_x = None
+        self.pan_y = None
+        self.export_executor = None
+        self.export_futures = []
+        self.export_poll_id = None
+        self.history = EditHistory()
+        self.crop_box = None
+        self.resize_key = None
+        self.preview_graph = EditGraph()
+        self.preview_x = 0
+        self.preview_y = 0
+        self.preview_pan = None
         
         
         self.start_x = None
@@ -23,6 +541,17 @@ class ImageEditorApp:
         self.rect = None
         
         
+        self.resize_condition = threading.Condition()
+        self.resize_job = None
+        self.resize_result = None
+        self.resize_generation = 0
+        self.resize_shown = 0
+        self.resize_after_id = None
+        self.resize_poll_id = None
+        self.resize_worker = threading.Thread(target=self.resize_worker_loop, daemon=True)
+        self.resize_worker.start()
+        
+        
         self.setup_ui()
 
     def setup_ui(self):
@@ -30,31 +559,69 @@ class ImageEditorApp:
         load_btn = ttk.Button(self.root, text="Load Image", command=self.load_image)
         load_btn.pack(pady=5)
 
+        history_frame = tk.Frame(self.root)
+        history_frame.pack()
+        ttk.Button(history_frame, text="Undo", command=self.undo).grid(row=0, column=0, padx=5)
+        ttk.Button(history_frame, text="Redo", command=self.redo).grid(row=0, column=1, padx=5)
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+        self.root.bind("<Control-Z>", lambda event: self.redo())
+
         
         self.frame = tk.Frame(self.root)
         self.frame.pack()
 
         
-        self.canvas_original = tk.Canvas(self.frame, width=400, height=400, bg='gray')
+        self.canvas_original = tk.Canvas(self.frame, width=PREVIEW_SIZE, height=PREVIEW_SIZE, bg='gray')
         self.canvas_original.grid(row=0, column=0, padx=5, pady=5)
 
         
-        self.canvas_cropped = tk.Canvas(self.frame, width=400, height=400, bg='gray')
+        self.canvas_cropped = tk.Canvas(self.frame, width=PREVIEW_SIZE, height=PREVIEW_SIZE, bg='gray')
         self.canvas_cropped.grid(row=0, column=1, padx=5, pady=5)
 
+        self.original_view = CanvasImage(self.canvas_original)
+        self.cropped_view = CanvasImage(self.canvas_cropped)
+        self.canvas_cropped.bind("<ButtonPress-1>", self.on_preview_pan_start)
+        self.canvas_cropped.bind("<B1-Motion>", self.on_preview_pan_drag)
+
         
         self.resize_slider = ttk.Scale(self.root, from_=10, to=300, orient=tk.HORIZONTAL, command=self.resize_cropped)
         self.resize_slider.pack(fill='x', padx=10, pady=10)
         self.resize_slider.set(100)
 
+        adjust_frame = tk.Frame(self.root)
+        adjust_frame.pack(fill='x', padx=10)
+        adjust_frame.columnconfigure(1, weight=1)
+        self.adjust_sliders = {}
+        for row, (name, label, low, high, default) in enumerate(ADJUSTMENTS):
+            ttk.Label(adjust_frame, text=label).grid(row=row, column=0, sticky='w')
+            slider = ttk.Scale(adjust_frame, from_=low, to=high, orient=tk.HORIZONTAL,
+                               command=lambda value, name=name: self.on_adjust(name, value))
+            slider.grid(row=row, column=1, sticky='ew', padx=5)
+            slider.set(default)
+            self.adjust_sliders[name] = slider
+        rotate_btn = ttk.Button(adjust_frame, text="Rotate 90\u00b0", command=self.rotate)
+        rotate_btn.grid(row=len(ADJUSTMENTS), column=0, columnspan=2, pady=5)
+
         
         save_btn = ttk.Button(self.root, text="Save Modified Image", command=self.save_image)
         save_btn.pack(pady=5)
 
+        self.export_progress = ttk.Progressbar(self.root, mode="determinate")
+        self.export_progress.pack(fill='x', padx=10)
+        self.export_status = ttk.Label(self.root, text="")
+        self.export_status.pack(pady=(0, 5))
+
         
         self.canvas_original.bind("<ButtonPress-1>", self.on_button_press)
         self.canvas_original.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas_original.bind("<ButtonRelease-1>", self.on_button_release)
+        self.canvas_original.bind("<MouseWheel>", self.on_zoom)
+        self.canvas_original.bind("<Button-4>", self.on_zoom)
+        self.canvas_original.bind("<Button-5>", self.on_zoom)
+        for button in (2, 3):
+            self.canvas_original.bind(f"<ButtonPress-{button}>", self.on_pan_start)
+            self.canvas_original.bind(f"<B{button}-Motion>", self.on_pan_drag)
 
     def load_image(self):
         file_path = filedialog.askopenfilename(
@@ -62,27 +629,100 @@ class ImageEditorApp:
         if not file_path:
             return
 
-        self.original_image = cv2.imread(file_path)
-        if self.original_image is None:
+        size = image_size(file_path)
+        tiled = size is not None and size[0] * size[1] > TILED_PIXELS
+        preview = None if tiled or size is None else read_preview(file_path)
+        if not tiled and preview is None:
             messagebox.showerror("Error", "Failed to load image.")
             return
 
+        self.original_image = None
+        self.display_size = None
+        self.tiled_preview = None
+        self.pyramid = None
+        self.view_scale = None
+        self.full_image_future = Future()
+        self.full_image_action = None
+        threading.Thread(target=self.decode_full_image, args=(file_path, tiled, self.full_image_future),
+                         daemon=True).start()
+        if self.full_image_poll_id is not None:
+            self.root.after_cancel(self.full_image_poll_id)
+            self.root.config(cursor="")
+        self.poll_full_image()
         
-        image_rgb = cv2.cvtColor(self.original_image, cv2.COLOR_BGR2RGB)
-        self.display_image = Image.fromarray(image_rgb)
+        self.cropped_view.clear()
+        self.cancel_resize()
+        self.history.clear()
+        self.preview_graph = EditGraph()
+        self.crop_box = None
+        self.preview_x = self.preview_y = 0
+        self.resize_slider.set(100)
+        for name, value in zip(ADJUSTMENT_NAMES, DEFAULT_ADJUSTMENTS):
+            self.adjust_sliders[name].set(value)
+        self.cropped_image = None
 
+        if tiled:
+            self.original_view.clear()
+            self.canvas_original.create_text(PREVIEW_SIZE // 2, PREVIEW_SIZE // 2, text="Preparing large image...")
+            self.full_image(self.show_tiled_preview)
+        else:
+            self.show_original(preview)
+
+    def show_original(self, preview):
+        height, width = preview.shape[:2]
+        fit = min(1.0, PREVIEW_SIZE / max(width, height))
+        self.display_size = (max(1, int(width * fit)), max(1, int(height * fit)))
         
-        self.display_image.thumbnail((400, 400))
-        
-        self.tk_original_image = ImageTk.PhotoImage(self.display_image)
-        
-        self.canvas_original.config(width=self.tk_original_image.width(), height=self.tk_original_image.height())
-        self.canvas_original.delete("all")
-        self.canvas_original.create_image(0, 0, anchor=tk.NW, image=self.tk_original_image)
+        self.original_view.clear()
+        self.rect = None
+        self.original_view.show(preview, *self.display_size)
+
+    def decode_full_image(self, file_path, tiled, future):
+        # Runs on its own thread and only touches its own future; the Tk thread picks the result up
+        try:
+            preview = None
+            if tiled:
+                image = open_tiled(file_path)
+                height, width = image.shape[:2]
+                fit = PREVIEW_SIZE / max(width, height)
+                preview = resize_area(image, max(1, int(width * fit)), max(1, int(height * fit)))
+            else:
+                image = cv2.imread(file_path)
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result((image, preview))
+
+    def full_image(self, action, *args):
+        # Run action once the full image is decoded, without blocking the Tk thread
+        if self.full_image_poll_id is None:
+            action(*args)
+            return
+        self.full_image_action = (action, args)
+        self.root.config(cursor="watch")
+
+    def poll_full_image(self):
+        future = self.full_image_future
+        if not future.done():
+            self.full_image_poll_id = self.root.after(DECODE_POLL_MS, self.poll_full_image)
+            return
         
-        self.canvas_cropped.delete("all")
-        self.resize_slider.set(100)
-        self.cropped_image = None
+        self.full_image_poll_id = None
+        if future.exception() is None:
+            self.original_image, self.tiled_preview = future.result()
+        if self.full_image_action is not None:
+            self.root.config(cursor="")
+            action, args = self.full_image_action
+            self.full_image_action = None
+            action(*args)
+
+    def show_tiled_preview(self):
+        if self.original_image is None:
+            self.original_view.clear()
+            error = self.full_image_future.exception()
+            messagebox.showerror("Error", str(error) if isinstance(error, ValueError) else "Failed to load image.")
+            return
+        self.show_original(self.tiled_preview)
 
     def on_button_press(self, event):
         self.start_x = event.x
@@ -99,19 +739,20 @@ class ImageEditorApp:
         )
 
     def on_button_release(self, event):
-        if self.original_image is None:
+        if self.display_size is None:
             return
 
         x1, y1 = min(self.start_x, event.x), min(self.start_y, event.y)
         x2, y2 = max(self.start_x, event.x), max(self.start_y, event.y)
+        self.full_image(self.crop, x1, y1, x2, y2)
 
-        
-        img_w, img_h = self.display_image.width, self.display_image.height
-        scale_x = self.original_image.shape[1] / img_w
-        scale_y = self.original_image.shape[0] / img_h
+    def crop(self, x1, y1, x2, y2):
+        if self.original_image is None:
+            messagebox.showerror("Error", "Failed to load image.")
+            return
 
-        ix1, iy1 = int(x1 * scale_x), int(y1 * scale_y)
-        ix2, iy2 = int(x2 * scale_x), int(y2 * scale_y)
+        ix1, iy1 = self.canvas_to_image(x1, y1)
+        ix2, iy2 = self.canvas_to_image(x2, y2)
 
         
         if ix2 <= ix1 or iy2 <= iy1:
@@ -123,58 +764,428 @@ class ImageEditorApp:
             messagebox.showwarning("Warning", "Crop area too small!")
             return
 
-        crop_rgb = cv2.cvtColor(self.cropped_image, cv2.COLOR_BGR2RGB)
-        pil_cropped = Image.fromarray(crop_rgb)
-        pil_cropped.thumbnail((400, 400))
-        self.tk_cropped_image = ImageTk.PhotoImage(pil_cropped)
-
-        self.canvas_cropped.config(width=self.tk_cropped_image.width(), height=self.tk_cropped_image.height())
-        self.canvas_cropped.delete("all")
-        self.canvas_cropped.create_image(0, 0, anchor=tk.NW, image=self.tk_cropped_image)
+        self.cancel_resize()
+        self.crop_box = (ix1, iy1, ix2, iy2)
+        self.history.push("crop", self.crop_box)
+        self.preview_x = self.preview_y = 0
+        self.submit_resize(100.0)
 
         self.resize_slider.set(100)
 
+    def undo(self):
+        if self.history.undo():
+            self.restore_edit()
+
+    def redo(self):
+        if self.history.redo():
+            self.restore_edit()
+
+    def on_adjust(self, name, value):
+        value = round(float(value), 1)
+        if value != self.history.state()[3][ADJUSTMENT_NAMES.index(name)]:
+            self.history.push("adjust", (name, value))
+            self.resize_cropped(self.resize_slider.get())
+
+    def rotate(self):
+        self.history.push("rotate", (self.history.state()[2] + 3) % 4)
+        self.resize_cropped(self.resize_slider.get())
+
+    def restore_edit(self):
+        self.cancel_resize()
+        if self.history.state()[0] is not None and self.full_image_poll_id is not None:
+            self.full_image(self.restore_edit)
+            return
+        self.crop_box, scale, _, adjustments = self.history.state()
+        if self.crop_box is None:
+            self.cropped_image = None
+            self.cropped_view.clear()
+        else:
+            ix1, iy1, ix2, iy2 = self.crop_box
+            self.cropped_image = self.original_image[iy1:iy2, ix1:ix2]
+        self.resize_slider.set(scale)
+        for name, value in zip(ADJUSTMENT_NAMES, adjustments):
+            self.adjust_sliders[name].set(value)
+        self.cancel_resize()
+        if self.cropped_image is not None:
+            self.submit_resize(scale)
+
+    def canvas_to_image(self, x, y):
+        if self.view_scale is None:
+            img_w, img_h = self.display_size
+            return int(x * self.original_image.shape[1] / img_w), int(y * self.original_image.shape[0] / img_h)
+        return int(self.view_x + x / self.view_scale), int(self.view_y + y / self.view_scale)
+
+    def on_zoom(self, event):
+        if self.display_size is None:
+            return
+        if self.original_image is None:
+            return
+        
+        if self.pyramid is None:
+            self.pyramid = ImagePyramid(self.original_image)
+        fit = self.display_size[0] / self.original_image.shape[1]
+        if self.view_scale is None:
+            self.view_scale, self.view_x, self.view_y = fit, 0.0, 0.0
+
+        zoom_in = event.num == 4 or event.delta > 0
+        scale = self.view_scale * ZOOM_STEP if zoom_in else self.view_scale / ZOOM_STEP
+        scale = min(max(scale, fit), MAX_ZOOM)
+        self.view_x += event.x / self.view_scale - event.x / scale
+        self.view_y += event.y / self.view_scale - event.y / scale
+        self.view_scale = scale
+        self.render_view()
+
+    def on_pan_start(self, event):
+        self.pan_x, self.pan_y = event.x, event.y
+
+    def on_pan_drag(self, event):
+        if self.view_scale is None or self.pan_x is None:
+            return
+        
+        self.view_x -= (event.x - self.pan_x) / self.view_scale
+        self.view_y -= (event.y - self.pan_y) / self.view_scale
+        self.pan_x, self.pan_y = event.x, event.y
+        self.render_view()
+
+    def render_view(self):
+        height, width = self.original_image.shape[:2]
+        view_width, view_height = self.display_size
+        self.view_x = min(max(self.view_x, 0.0), max(width - view_width / self.view_scale, 0.0))
+        self.view_y = min(max(self.view_y, 0.0), max(height - view_height / self.view_scale, 0.0))
+
+        
+        level = self.pyramid.level_for(self.view_scale)
+        factor_x, factor_y = level.shape[1] / width, level.shape[0] / height
+        x1, y1 = int(self.view_x * factor_x), int(self.view_y * factor_y)
+        x2 = min(level.shape[1], math.ceil((self.view_x + view_width / self.view_scale) * factor_x))
+        y2 = min(level.shape[0], math.ceil((self.view_y + view_height / self.view_scale) * factor_y))
+        region = level[y1:y2, x1:x2]
+        interpolation = cv2.INTER_AREA if region.shape[1] >= view_width else cv2.INTER_LINEAR
+        self.original_view.show(region, view_width, view_height, interpolation)
+        if self.rect:
+            self.canvas_original.delete(self.rect)
+            self.rect = None
+
     def resize_cropped(self, value):
         if self.cropped_image is None:
             return
         
-        scale_percent = float(value) / 100
-        height, width = self.cropped_image.shape[:2]
-        new_width = max(1, int(width * scale_percent))
-        new_height = max(1, int(height * scale_percent))
+        if self.resize_after_id is not None:
+            self.root.after_cancel(self.resize_after_id)
+        self.resize_after_id = self.root.after(RESIZE_DEBOUNCE_MS, self.submit_resize, float(value))
 
-        resized = cv2.resize(self.cropped_image, (new_width, new_height), interpolation=cv2.INTER_AREA)
-        resized_rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
-        pil_resized = Image.fromarray(resized_rgb)
+    def submit_resize(self, value):
+        self.resize_after_id = None
+        if self.cropped_image is None:
+            return
+        
+        if value != self.history.state()[1]:
+            self.history.push("resize", value)
+        state = self.history.state()
+        width, height = edit_size(self.cropped_image.shape, state[1], state[2])
+        self.preview_x = min(max(self.preview_x, 0), max(width - PREVIEW_SIZE, 0))
+        self.preview_y = min(max(self.preview_y, 0), max(height - PREVIEW_SIZE, 0))
+        self.resize_key = (state, self.preview_x, self.preview_y)
+        cached = self.history.cached(self.resize_key)
+        if cached is not None:
+            self.cancel_resize()
+            self.cropped_view.show(cached, cached.shape[1], cached.shape[0])
+            return
+
+        with self.resize_condition:
+            self.resize_generation += 1
+            self.resize_job = (self.resize_generation, self.cropped_image, self.preview_graph, self.resize_key)
+            self.resize_condition.notify()
+        self.schedule_resize_poll()
+
+    def cancel_resize(self):
+        if self.resize_after_id is not None:
+            self.root.after_cancel(self.resize_after_id)
+            self.resize_after_id = None
+        with self.resize_condition:
+            self.resize_generation += 1
+            self.resize_job = None
+            self.resize_result = None
+            self.resize_shown = self.resize_generation
+
+    def resize_worker_loop(self):
+        while True:
+            with self.resize_condition:
+                while self.resize_job is None:
+                    self.resize_condition.wait()
+                generation, image, graph, key = self.resize_job
+                self.resize_job = None
+            
+            try:
+                resized = self.render_resized(generation, image, graph, key)
+            except Exception as error:
+                # Reported on the Tk thread by poll_resize
+                resized = error
+            
+            with self.resize_condition:
+                if resized is not None and generation == self.resize_generation:
+                    self.resize_result = (generation, resized)
+
+    def render_resized(self, generation, image, graph, key):
+        (_, scale_percent, rotation, adjustments), x, y = key
+        node = graph.build(image, scale_percent, rotation, adjustments)
+        width, height = node.size
+        if generation != self.resize_generation:
+            return None
+        return node.evaluate((x, y, min(width, x + PREVIEW_SIZE), min(height, y + PREVIEW_SIZE)))
+
+    def on_preview_pan_start(self, event):
+        self.preview_pan = (event.x, event.y)
+
+    def on_preview_pan_drag(self, event):
+        if self.cropped_image is None or self.preview_pan is None:
+            return
+        
+        self.preview_x -= event.x - self.preview_pan[0]
+        self.preview_y -= event.y - self.preview_pan[1]
+        self.preview_pan = (event.x, event.y)
+        self.resize_cropped(self.resize_slider.get())
 
-        self.tk_cropped_image = ImageTk.PhotoImage(pil_resized)
-        self.canvas_cropped.config(width=self.tk_cropped_image.width(), height=self.tk_cropped_image.height())
-        self.canvas_cropped.delete("all")
-        self.canvas_cropped.create_image(0, 0, anchor=tk.NW, image=self.tk_cropped_image)
+    def schedule_resize_poll(self):
+        if self.resize_poll_id is None:
+            self.resize_poll_id = self.root.after(RESIZE_POLL_MS, self.poll_resize)
+
+    def poll_resize(self):
+        self.resize_poll_id = None
+        with self.resize_condition:
+            result, self.resize_result = self.resize_result, None
+            generation = self.resize_generation
+        
+        if result is not None and result[0] == generation:
+            resized = result[1]
+            self.resize_shown = generation
+            if isinstance(resized, Exception):
+                messagebox.showerror("Error", f"Preview failed:\n{resized}")
+            else:
+                self.history.store(self.resize_key, resized)
+                self.cropped_view.show(resized, resized.shape[1], resized.shape[0])
+        if self.resize_shown != generation:
+            self.schedule_resize_poll()
 
     def save_image(self):
         if self.cropped_image is None:
             messagebox.showwarning("Warning", "No cropped image to save!")
             return
         
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".png",
-            filetypes=[("PNG files", "*.png"), ("JPEG files", "*.jpg;*.jpeg"), ("BMP files", "*.bmp")]
-        )
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Export")
+        dialog.transient(self.root)
+        for column, heading in enumerate(("", "Suffix", "Scale %", "Format", "JPEG quality", "PNG compression")):
+            ttk.Label(dialog, text=heading).grid(row=0, column=column, padx=5, pady=5)
+
+        rows = []
+        for index, (suffix, scale, file_format, quality, compression) in enumerate(EXPORT_PRESETS, 1):
+            if index == 1:
+                scale = round(self.resize_slider.get())
+            row = (
+                tk.BooleanVar(value=True), tk.StringVar(value=suffix), tk.IntVar(value=scale),
+                tk.StringVar(value=file_format), tk.IntVar(value=quality), tk.IntVar(value=compression),
+            )
+            ttk.Checkbutton(dialog, variable=row[0]).grid(row=index, column=0, padx=5)
+            ttk.Entry(dialog, textvariable=row[1], width=10).grid(row=index, column=1, padx=5)
+            ttk.Spinbox(dialog, textvariable=row[2], from_=1, to=300, width=6).grid(row=index, column=2, padx=5)
+            ttk.Combobox(dialog, textvariable=row[3], values=EXPORT_FORMATS, state="readonly", width=5).grid(
+                row=index, column=3, padx=5)
+            ttk.Spinbox(dialog, textvariable=row[4], from_=1, to=100, width=5).grid(row=index, column=4, padx=5)
+            ttk.Spinbox(dialog, textvariable=row[5], from_=0, to=9, width=5).grid(row=index, column=5, padx=5)
+            rows.append(row)
+
+        export_btn = ttk.Button(dialog, text="Export", command=lambda: self.start_export(dialog, rows))
+        export_btn.grid(row=len(rows) + 1, column=0, columnspan=6, pady=10)
+        dialog.grab_set()
+
+    def start_export(self, dialog, rows):
+        try:
+            presets = [tuple(variable.get() for variable in row[1:]) for row in rows if row[0].get()]
+        except tk.TclError:
+            messagebox.showwarning("Warning", "Scale, quality and compression must be numbers!", parent=dialog)
+            return
+        if not presets:
+            messagebox.showwarning("Warning", "No export preset selected!", parent=dialog)
+            return
+        
+        file_path = filedialog.asksaveasfilename(parent=dialog, title="Export base name")
         if not file_path:
             return
+        dialog.destroy()
+
+        base = os.path.splitext(file_path)[0]
+        if self.export_executor is None:
+            self.export_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="export")
+        _, _, rotation, adjustments = self.history.state()
+        for suffix, scale, file_format, quality, compression in presets:
+            self.export_futures.append(self.export_executor.submit(
+                export_image, self.cropped_image, f"{base}{suffix}.{file_format}",
+                max(1, scale), min(max(quality, 0), 100), min(max(compression, 0), 9), rotation, adjustments))
+        self.show_export_progress()
+        if self.export_poll_id is None:
+            self.export_poll_id = self.root.after(EXPORT_POLL_MS, self.poll_export)
+
+    def show_export_progress(self):
+        done = sum(future.done() for future in self.export_futures)
+        self.export_progress.config(maximum=len(self.export_futures), value=done)
+        self.export_status.config(text=f"Exporting {done}/{len(self.export_futures)}...")
+        return done
+
+    def poll_export(self):
+        self.export_poll_id = None
+        if self.show_export_progress() < len(self.export_futures):
+            self.export_poll_id = self.root.after(EXPORT_POLL_MS, self.poll_export)
+            return
+        
+        saved, errors = [], []
+        try:
+            for future in self.export_futures:
+                try:
+                    saved.append(future.result())
+                except Exception as error:
+                    errors.append(f"{type(error).__name__}: {error}")
+        finally:
+            self.export_futures = []
+            self.export_status.config(text="")
+            self.export_progress.config(value=0)
+        if errors:
+            messagebox.showerror("Error", "Export failed:\n" + "\n".join(errors))
+        if saved:
+            messagebox.showinfo("Saved", "Images saved successfully at:\n" + "\n".join(saved))
+
+def parse_box(text):
+    values = [float(value) for value in text.split(",")]
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("expected four comma-separated numbers")
+    return values
+
+
+def crop_box(shape, crop, crop_relative):
+    height, width = shape[:2]
+    if crop_relative is not None:
+        left, top, right, bottom = crop_relative
+        crop = (left * width, top * height, right * width, bottom * height)
+    if crop is None:
+        return 0, 0, width, height
+    
+    x1, y1, x2, y2 = (int(value) for value in crop)
+    return max(x1, 0), max(y1, 0), min(x2, width), min(y2, height)
+
+
+def init_batch_worker():
+    cv2.setNumThreads(1)
+
+
+def process_file(source, target, crop, crop_relative, scale_percent):
+    size = image_size(source)
+    if size is None:
+        return "failed to load"
+    if size[0] * size[1] > TILED_PIXELS:
+        try:
+            image = open_tiled(source)
+        except (OSError, ValueError) as error:
+            return " ".join(str(error).splitlines())
+    else:
+        image = cv2.imread(source)
+    if image is None:
+        return "failed to load"
+
+    ix1, iy1, ix2, iy2 = crop_box(image.shape, crop, crop_relative)
+    if ix2 <= ix1 or iy2 <= iy1:
+        return "crop area outside the image"
+
+    cropped = image[iy1:iy2, ix1:ix2]
+    height, width = cropped.shape[:2]
+    new_width = max(1, int(width * scale_percent / 100))
+    new_height = max(1, int(height * scale_percent / 100))
+
+    resized = resize_area(cropped, new_width, new_height)
+    if not cv2.imwrite(target, resized):
+        return "failed to write"
+    return None
+
+
+def load_manifest(folder):
+    try:
+        with open(os.path.join(folder, BATCH_MANIFEST)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(folder, manifest):
+    path = os.path.join(folder, BATCH_MANIFEST)
+    with open(path + ".tmp", "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(description="Crop, resize and save every image in a folder.")
+    parser.add_argument("input", help="folder of images to process")
+    parser.add_argument("output", help="folder to write the results to")
+    box = parser.add_mutually_exclusive_group()
+    box.add_argument("--crop", type=parse_box, metavar="X1,Y1,X2,Y2", help="crop box in pixels")
+    box.add_argument("--crop-relative", type=parse_box, metavar="L,T,R,B",
+                     help="crop box as fractions (0-1) of the image size")
+    parser.add_argument("--scale", type=float, default=100, help="resize percentage (default 100)")
+    parser.add_argument("--format", choices=("png", "jpg", "bmp"), default="png", help="output format")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--force", action="store_true", help="also redo outputs that are up to date")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    # Outputs are only up to date if they were made from the same source with the same options
+    params = json.loads(json.dumps({"crop": args.crop, "crop_relative": args.crop_relative, "scale": args.scale}))
+    manifest = load_manifest(args.output)
+    sources = {}
+    jobs = []
+    skipped = 0
+    for name in sorted(os.listdir(args.input)):
+        source = os.path.join(args.input, name)
+        if not name.lower().endswith(IMAGE_EXTENSIONS) or not os.path.isfile(source):
+            continue
+        target_name = os.path.splitext(name)[0] + "." + args.format
+        if target_name in sources:
+            parser.error(f"{sources[target_name]} and {name} would both be written to {target_name}")
+        sources[target_name] = name
+
+        target = os.path.join(args.output, target_name)
+        if (not args.force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source)
+                and manifest.get(target_name) == {"source": name, "params": params}):
+            skipped += 1
+            continue
+        manifest.pop(target_name, None)
+        jobs.append((source, target, target_name))
 
-        scale_percent = self.resize_slider.get() / 100
-        height, width = self.cropped_image.shape[:2]
-        new_width = max(1, int(width * scale_percent))
-        new_height = max(1, int(height * scale_percent))
+    print(f"{len(jobs)} to process, {skipped} up to date", flush=True)
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_batch_worker) as executor:
+            futures = {
+                executor.submit(process_file, source, target, args.crop, args.crop_relative, args.scale):
+                    (source, target_name)
+                for source, target, target_name in jobs
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                source, target_name = futures[future]
+                error = future.result()
+                if error:
+                    failed += 1
+                    print(f"[{done}/{len(jobs)}] {source}: {error}", flush=True)
+                else:
+                    manifest[target_name] = {"source": sources[target_name], "params": params}
+                    print(f"[{done}/{len(jobs)}] {source}", flush=True)
+    finally:
+        save_manifest(args.output, manifest)
 
-        resized = cv2.resize(self.cropped_image, (new_width, new_height), interpolation=cv2.INTER_AREA)
-        cv2.imwrite(file_path, resized)
-        messagebox.showinfo("Saved", f"Image saved successfully at:\n{file_path}")
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_main(sys.argv[1:]))
     root = tk.Tk()
     app = ImageEditorApp(root)
     root.mainloop()
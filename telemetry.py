@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Telemetry System for Wild Defender Game
+=======================================
+
+Collects frame-time histograms and per-frame counters during a session and
+periodically writes them to a local CSV or JSONL file from a background thread.
+A CSV file written with other columns is moved aside rather than appended to.
+"""
+
+import pygame
+import csv
+import json
+import logging
+import os
+import platform
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class FrameTimeHistogram:
+    """HDR-style histogram of frame times with fixed relative precision"""
+    
+    def __init__(self, highest_ms: float = 10000.0, significant_figures: int = 2):
+        # Values are stored as integer microseconds
+        self.highest_value = int(highest_ms * 1000)
+        largest_single_unit = 2 * 10 ** significant_figures
+        self.sub_bucket_count = 1 << (largest_single_unit - 1).bit_length()
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_half_count_magnitude = self.sub_bucket_half_count.bit_length() - 1
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+        
+        # Number of power-of-two buckets needed to cover the highest value
+        bucket_count = 1
+        smallest_untrackable = self.sub_bucket_count
+        while smallest_untrackable <= self.highest_value:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = [0] * ((bucket_count + 1) * self.sub_bucket_half_count)
+        self.reset()
+    
+    def reset(self):
+        """Clear all recorded values"""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.total_count = 0
+        self.total_value = 0
+        self.min_value = 0
+        self.max_value = 0
+    
+    def _counts_index(self, value: int) -> int:
+        """Map a value in microseconds to its slot in the counts array"""
+        bucket_index = (value | self.sub_bucket_mask).bit_length() - (self.sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self.sub_bucket_half_count_magnitude) + (sub_bucket_index - self.sub_bucket_half_count)
+    
+    def _value_at_index(self, index: int) -> int:
+        """Lowest value in microseconds represented by a counts slot"""
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return sub_bucket_index << bucket_index
+    
+    def record(self, seconds: float):
+        """Record a single frame time given in seconds"""
+        value = min(max(int(seconds * 1000000), 0), self.highest_value)
+        self.counts[self._counts_index(value)] += 1
+        if self.total_count == 0 or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+        self.total_count += 1
+        self.total_value += value
+    
+    def percentile(self, percent: float) -> float:
+        """Return the frame time in milliseconds at the given percentile"""
+        if self.total_count == 0:
+            return 0.0
+        target = max(1, int(self.total_count * percent / 100.0 + 0.5))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return min(self._value_at_index(index), self.max_value) / 1000.0
+        return self.max_value / 1000.0
+    
+    def mean(self) -> float:
+        """Return the mean frame time in milliseconds"""
+        if self.total_count == 0:
+            return 0.0
+        return self.total_value / self.total_count / 1000.0
+    
+    def summary(self, prefix: str) -> Dict[str, float]:
+        """Summarize the histogram as a flat dictionary of millisecond values"""
+        return {
+            f'{prefix}_count': self.total_count,
+            f'{prefix}_mean_ms': round(self.mean(), 3),
+            f'{prefix}_min_ms': self.min_value / 1000.0,
+            f'{prefix}_p50_ms': self.percentile(50),
+            f'{prefix}_p90_ms': self.percentile(90),
+            f'{prefix}_p99_ms': self.percentile(99),
+            f'{prefix}_p999_ms': self.percentile(99.9),
+            f'{prefix}_max_ms': self.max_value / 1000.0,
+        }
+
+class Telemetry:
+    """Session telemetry with a background writer thread"""
+    
+    COUNTERS = ('projectiles_spawned', 'collisions_tested', 'objects_drawn', 'ai_decisions')
+    FIELDS = (
+        ['session', 'build', 'machine', 'platform', 'python', 'pygame', 'timestamp', 'interval_s']
+        + list(FrameTimeHistogram().summary('frame'))
+        + list(FrameTimeHistogram().summary('work'))
+        + list(FrameTimeHistogram().summary('ai_latency'))
+        + ['entities_alive', 'entities_alive_max', 'ai_queue_depth_max']
+        + list(COUNTERS)
+    )
+    
+    def __init__(self, path: str, flush_interval: float = 5.0, build: str = 'dev'):
+        self.path = path
+        self.format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        self.flush_interval = flush_interval
+        self.frame_times = FrameTimeHistogram()
+        self.work_times = FrameTimeHistogram()
+        self.ai_latencies = FrameTimeHistogram()
+        self.ai_queue_depth_max = 0
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.entities_alive = 0
+        self.entities_alive_max = 0
+        
+        # Static information identifying the build and machine
+        self.context = {
+            'session': uuid.uuid4().hex[:12],
+            'build': build,
+            'machine': platform.node(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+        }
+        
+        self.last_flush = time.perf_counter()
+        self.error: Optional[Exception] = None  # set by the writer thread when it gives up
+        self._error_reported = False
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='telemetry-writer', daemon=True)
+        self._writer.start()
+    
+    def record_frame(self, frame_time: float, work_time: float):
+        """Record the frame interval and the time spent updating and drawing"""
+        self.frame_times.record(frame_time)
+        self.work_times.record(work_time)
+        
+        now = time.perf_counter()
+        if now - self.last_flush >= self.flush_interval:
+            self.flush(now)
+    
+    def count(self, name: str, amount: int = 1):
+        """Increase a counter for the current interval"""
+        self.counters[name] += amount
+    
+    def record_ai(self, queue_depth: int, latency: float):
+        """Record the enemies left undecided this frame and the oldest decision refreshed (seconds)"""
+        if latency > 0:
+            self.ai_latencies.record(latency)
+        if queue_depth > self.ai_queue_depth_max:
+            self.ai_queue_depth_max = queue_depth
+    
+    def set_entities_alive(self, count: int):
+        """Update the number of live entities"""
+        self.entities_alive = count
+        if count > self.entities_alive_max:
+            self.entities_alive_max = count
+    
+    def flush(self, now: Optional[float] = None):
+        """Hand the current interval to the writer thread and start a new one"""
+        if now is None:
+            now = time.perf_counter()
+        
+        if self.error is not None and not self._error_reported:
+            logger.error("telemetry disabled, cannot write %s: %s", self.path, self.error)
+            self._error_reported = True
+        
+        if self.frame_times.total_count and self.error is None:
+            record = dict(self.context)
+            record['timestamp'] = round(time.time(), 3)
+            record['interval_s'] = round(now - self.last_flush, 3)
+            record.update(self.frame_times.summary('frame'))
+            record.update(self.work_times.summary('work'))
+            record.update(self.ai_latencies.summary('ai_latency'))
+            record['entities_alive'] = self.entities_alive
+            record['entities_alive_max'] = self.entities_alive_max
+            record['ai_queue_depth_max'] = self.ai_queue_depth_max
+            record.update(self.counters)
+            self._queue.put(record)
+        
+        # Start a fresh interval
+        self.frame_times.reset()
+        self.work_times.reset()
+        self.ai_latencies.reset()
+        self.ai_queue_depth_max = 0
+        for name in self.counters:
+            self.counters[name] = 0
+        self.entities_alive_max = self.entities_alive
+        self.last_flush = now
+    
+    def close(self):
+        """Flush remaining data and wait for the writer to finish"""
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+    
+    def _write_loop(self):
+        """Writer thread: append queued records to the telemetry file"""
+        try:
+            self._write_records()
+        except (OSError, ValueError) as error:
+            # Reported by the main thread on its next flush
+            self.error = error
+            while self._queue.get() is not None:
+                pass
+    
+    def _write_records(self):
+        """Append queued records until the end marker, starting a new CSV file if the columns changed"""
+        write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if self.format == 'csv' and not write_header:
+            with open(self.path, newline='') as existing:
+                header = next(csv.reader(existing), [])
+            if header != self.FIELDS:
+                root, extension = os.path.splitext(self.path)
+                os.replace(self.path, f"{root}.{time.strftime('%Y%m%d-%H%M%S')}{extension}")
+                write_header = True
+        
+        with open(self.path, 'a', newline='') as output:
+            writer = csv.DictWriter(output, fieldnames=self.FIELDS) if self.format == 'csv' else None
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                
+                if writer is not None:
+                    if write_header:
+                        writer.writeheader()
+                        write_header = False
+                    writer.writerow(record)
+                else:
+                    output.write(json.dumps(record) + '\n')
+                output.flush()
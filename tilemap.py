@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Tile Maps for Wild Defender Game
+================================
+
+Per-level collision and scenery layer on a regular grid. Collision never loops
+over tiles: an entity's bounding box is turned into grid indices directly, and
+only the cells along the edge it moves across are read. Movement is resolved
+one axis at a time, so entities slide along walls and land on platforms.
+
+Solid tiles block from every side; platform tiles can be jumped through from
+below and only catch entities falling onto their top. For drawing, the map is
+pre-rendered into chunk surfaces once per level and only chunks that overlap
+the camera are blitted.
+"""
+
+import math
+import pygame
+import numpy as np
+from typing import Dict, List, Tuple
+from camera import Camera
+from constants import BROWN
+
+TILE_SIZE = 40
+CHUNK_TILES = 8  # chunk surfaces are CHUNK_TILES x CHUNK_TILES tiles
+
+# Tile kinds
+EMPTY = 0
+SOLID = 1
+PLATFORM = 2
+
+# Below this many boxes a plain loop beats the fixed per-call cost of the NumPy sweep
+BATCH_MIN = 32
+
+PLATFORM_THICKNESS = 10  # drawn height of a platform plank
+TRANSPARENT = (255, 0, 255)  # colour key of the chunk surfaces
+
+class TileMap:
+    """Grid of tiles covering the world"""
+    
+    def __init__(self, width: int, height: int, tile_size: int = TILE_SIZE):
+        self.tile_size = tile_size
+        self.rows = -(-height // tile_size)
+        self.columns = -(-width // tile_size)
+        self.tiles = np.zeros((self.rows, self.columns), dtype=np.uint8)
+        self.chunks: Dict[Tuple[int, int], pygame.Surface] = {}
+        self._update_masks()
+    
+    def fill(self, kind: int, x: float, y: float, width: float, height: float):
+        """Set every tile overlapped by a rectangle given in world pixels"""
+        size = self.tile_size
+        left, top = max(int(x // size), 0), max(int(y // size), 0)
+        right, bottom = -int(-(x + width) // size), -int(-(y + height) // size)
+        self.tiles[top:bottom, left:right] = kind
+        self._update_masks()
+    
+    def _update_masks(self):
+        """Recompute the per-kind collision masks"""
+        self.solid = self.tiles == SOLID
+        self.floor = self.tiles != EMPTY  # tiles that can be landed on
+        self._solid_rows: List[List[bool]] = self.solid.tolist()
+        self._floor_rows: List[List[bool]] = self.floor.tolist()
+    
+    def resolve(self, position: np.ndarray, velocity: np.ndarray, size: np.ndarray,
+                dt: float) -> np.ndarray:
+        """Move bounding boxes (feet at position) by velocity * dt against the map, in place; return on-ground flags"""
+        if len(position) >= BATCH_MIN:
+            return self._resolve_batch(position, velocity, size, dt)
+        positions, velocities = position.tolist(), velocity.tolist()
+        grounded, stopped = self.move(positions, velocities, size.tolist(), dt)
+        position[:] = positions
+        if stopped:
+            velocity[:] = velocities
+        return np.array(grounded, dtype=bool)
+    
+    def move(self, positions: List[List[float]], velocities: List[List[float]], sizes: List[List[float]],
+             dt: float) -> Tuple[List[bool], bool]:
+        """resolve() one box at a time on [x, y] lists, in place; return on-ground flags and whether any box stopped"""
+        tile = self.tile_size
+        solid, floor_rows = self._solid_rows, self._floor_rows
+        floor, ceil = math.floor, math.ceil
+        column_count, last_row = self.columns, self.rows - 1
+        grounded = []
+        stopped = False
+        for index, ((x, y), (vx, vy), (width, height)) in enumerate(zip(positions, velocities, sizes)):
+            half_width = width / 2
+            top = y - height
+            
+            # Horizontal pass: columns whose near edge the leading side crosses
+            new_x = x + vx * dt
+            if vx:
+                rows = solid[max(floor(top / tile), 0):max(min(ceil(y / tile), last_row + 1), 0)]
+                if vx > 0:
+                    for column in range(max(ceil((x + half_width) / tile), 0),
+                                        min(ceil((new_x + half_width) / tile), column_count)):
+                        if any(row[column] for row in rows):
+                            new_x, vx = column * tile - half_width, 0.0
+                            break
+                else:
+                    for column in range(min(floor((x - half_width) / tile) - 1, column_count - 1),
+                                        max(floor((new_x - half_width) / tile) - 1, -1), -1):
+                        if any(row[column] for row in rows):
+                            new_x, vx = (column + 1) * tile + half_width, 0.0
+                            break
+            
+            # Vertical pass over the columns of the box at its new x; rows and
+            # columns outside the map are empty, so both ranges are clamped to it
+            new_y = y + vy * dt
+            columns = slice(max(floor((new_x - half_width) / tile), 0),
+                            max(min(ceil((new_x + half_width) / tile), column_count), 0))
+            on_ground = False
+            if vy >= 0:
+                for row in range(max(ceil(y / tile), 0), min(floor(new_y / tile), last_row) + 1):
+                    if any(floor_rows[row][columns]):
+                        new_y, vy, on_ground = row * tile, 0.0, True
+                        break
+            else:
+                for row in range(min(floor(top / tile) - 1, last_row), max(floor((new_y - height) / tile) - 1, -1), -1):
+                    if any(solid[row][columns]):
+                        new_y, vy = (row + 1) * tile + height, 0.0
+                        break
+            
+            positions[index] = [new_x, new_y]
+            if [vx, vy] != velocities[index]:
+                velocities[index] = [vx, vy]
+                stopped = True
+            grounded.append(on_ground)
+        return grounded, stopped
+    
+    def _resolve_batch(self, position: np.ndarray, velocity: np.ndarray, size: np.ndarray,
+                       dt: float) -> np.ndarray:
+        """resolve() for all boxes at once"""
+        half_width = size[:, 0] / 2
+        
+        # Horizontal pass: only solid tiles in the columns the leading edge crosses
+        x = position[:, 0]
+        new_x = x + velocity[:, 0] * dt
+        top = position[:, 1] - size[:, 1]
+        row_lo, row_hi = self._span(top, position[:, 1])
+        right = velocity[:, 0] > 0
+        hit, column = self._sweep_right(self.solid, x + half_width, new_x + half_width, row_lo, row_hi, right)
+        new_x[hit] = column[hit] * self.tile_size - half_width[hit]
+        blocked = hit
+        left = velocity[:, 0] < 0
+        hit, column = self._sweep_left(self.solid, x - half_width, new_x - half_width, row_lo, row_hi, left)
+        new_x[hit] = (column[hit] + 1) * self.tile_size + half_width[hit]
+        blocked |= hit
+        velocity[blocked, 0] = 0.0
+        position[:, 0] = new_x
+        
+        # Vertical pass over the columns of the box at its new x
+        y = position[:, 1]
+        new_y = y + velocity[:, 1] * dt
+        column_lo, column_hi = self._span(new_x - half_width, new_x + half_width)
+        falling = velocity[:, 1] >= 0
+        grounded, row = self._sweep_right(self.floor, y, new_y, column_lo, column_hi, falling, vertical=True)
+        new_y[grounded] = row[grounded] * self.tile_size
+        rising = ~falling
+        hit, row = self._sweep_left(self.solid, top, new_y - size[:, 1], column_lo, column_hi, rising, vertical=True)
+        new_y[hit] = (row[hit] + 1) * self.tile_size + size[hit, 1]
+        velocity[grounded | hit, 1] = 0.0
+        position[:, 1] = new_y
+        return grounded
+    
+    def _span(self, low: np.ndarray, high: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """First and last tile index overlapped by the open intervals (low, high)"""
+        size = self.tile_size
+        return (low // size).astype(np.intp), (np.ceil(high / size) - 1).astype(np.intp)
+    
+    def _sweep_right(self, mask: np.ndarray, edge: np.ndarray, new_edge: np.ndarray,
+                     across_lo: np.ndarray, across_hi: np.ndarray, moving: np.ndarray,
+                     vertical: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """First grid line with edge <= line < new_edge (or <= for vertical, so resting counts) backed by a masked tile"""
+        size = self.tile_size
+        first = np.ceil(edge / size).astype(np.intp)
+        last = (np.floor(new_edge / size) if vertical else np.ceil(new_edge / size) - 1).astype(np.intp)
+        return self._first_blocked(mask, first, last - first + 1, 1, across_lo, across_hi, moving, vertical)
+    
+    def _sweep_left(self, mask: np.ndarray, edge: np.ndarray, new_edge: np.ndarray,
+                    across_lo: np.ndarray, across_hi: np.ndarray, moving: np.ndarray,
+                    vertical: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """First tile whose far edge the moving edge crosses going left (or up)"""
+        size = self.tile_size
+        first = (np.floor(edge / size) - 1).astype(np.intp)
+        last = np.floor(new_edge / size).astype(np.intp)
+        return self._first_blocked(mask, first, first - last + 1, -1, across_lo, across_hi, moving, vertical)
+    
+    def _first_blocked(self, mask: np.ndarray, first: np.ndarray, count: np.ndarray, step: int,
+                       across_lo: np.ndarray, across_hi: np.ndarray, moving: np.ndarray,
+                       vertical: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Scan count tile lines from first in the direction of step; return hit flags and the first blocked line"""
+        count = np.where(moving, count, 0)
+        lines = int(count.max(initial=0))
+        if lines <= 0:
+            return np.zeros(len(first), dtype=bool), first
+        
+        # Every (entity, line, cell across) combination, indexed straight into the grid
+        offsets = np.arange(lines)
+        line = first[:, None, None] + step * offsets[None, :, None]
+        across = across_lo[:, None, None] + np.arange(int((across_hi - across_lo).max()) + 1)[None, None, :]
+        valid = (offsets[None, :, None] < count[:, None, None]) & (across <= across_hi[:, None, None])
+        row, column = (line, across) if vertical else (across, line)
+        valid &= (row >= 0) & (row < self.rows) & (column >= 0) & (column < self.columns)
+        blocked = mask[row.clip(0, self.rows - 1), column.clip(0, self.columns - 1)] & valid
+        
+        hits = blocked.any(axis=2)
+        return hits.any(axis=1), first + step * hits.argmax(axis=1)
+    
+    def render(self, surface: pygame.Surface):
+        """Pre-render every non-empty chunk in the pixel format of surface"""
+        size = self.tile_size
+        self.chunks.clear()
+        for chunk_row in range(0, self.rows, CHUNK_TILES):
+            for chunk_column in range(0, self.columns, CHUNK_TILES):
+                tiles = self.tiles[chunk_row:chunk_row + CHUNK_TILES, chunk_column:chunk_column + CHUNK_TILES]
+                if not tiles.any():
+                    continue
+                
+                rows, columns = tiles.shape
+                chunk = pygame.Surface((columns * size, rows * size), 0, surface)
+                chunk.fill(TRANSPARENT)
+                for row, column in zip(*tiles.nonzero()):
+                    height = size if tiles[row, column] == SOLID else PLATFORM_THICKNESS
+                    chunk.fill(BROWN, (column * size, row * size, size, height))
+                
+                # Fully solid chunks are blitted as plain copies
+                if (tiles != SOLID).any():
+                    chunk.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+                self.chunks[chunk_row // CHUNK_TILES, chunk_column // CHUNK_TILES] = chunk
+    
+    def draw(self, screen: pygame.Surface, camera: Camera):
+        """Blit the chunks that overlap the camera"""
+        chunk_size = CHUNK_TILES * self.tile_size
+        width, height = screen.get_size()
+        first_column, first_row = int(camera.x // chunk_size), int(camera.y // chunk_size)
+        last_column = int((camera.x + width) // chunk_size)
+        last_row = int((camera.y + height) // chunk_size)
+        for chunk_row in range(first_row, last_row + 1):
+            for chunk_column in range(first_column, last_column + 1):
+                chunk = self.chunks.get((chunk_row, chunk_column))
+                if chunk is not None:
+                    screen.blit(chunk, (chunk_column * chunk_size - int(camera.x), chunk_row * chunk_size - int(camera.y)))